@@ -13,6 +13,55 @@ class Settings:
     """
     MAX_HEADING_LENGTH: int = 150
     MIN_HEADING_CONFIDENCE: float = 0.4
+    FORCE_HEURISTICS: bool = False  # Ignore the PDF's own bookmarks and always detect headings
+    MIN_BOOKMARKS: int = 2  # Fewer bookmarks than this are not trusted as an outline
+    COALESCE_LINES: bool = True  # Merge the spans of each text line into one block
+    MERGE_HEADING_LINES: bool = False  # Join heading candidates that wrap onto the following line
+
+    # Batch execution
+    WORKERS: int = 1  # Worker processes for process_pdfs (1 = sequential)
+    PAGE_WORKERS: int = 1  # Worker processes splitting the pages of one large PDF
+    PAGE_CHUNK_SIZE: int = 50  # Pages handed to a page worker at a time
+    MIN_PAGES_FOR_PAGE_WORKERS: int = 200  # Smaller documents are always parsed in-process
+    MMAP_MIN_MB: int = 8  # Larger files are memory-mapped and parsed in place (if PyMuPDF can)
+    DOCUMENT_TIME_BUDGET: float = 0.0  # Seconds per document before the rest is skipped (0 = none)
+    STORE_SHRINK_INTERVAL: int = 0  # Pages between trims of MuPDF's object store (0 = never trim)
+    STORE_SHRINK_PERCENT: int = 100  # Share of the store freed by each trim
+    SCHEDULE_BY_COST: bool = True  # Pre-scan files and dispatch the most expensive first
+    SCHEDULE_SAMPLE_PAGES: int = 3  # Pages sampled per file to detect scanned documents
+
+    # OCR
+    SCANNED_TEXT_THRESHOLD: int = 50  # Fewer visible characters over a large image: scanned
+    SCANNED_IMAGE_COVERAGE: float = 0.5  # Page fraction images must cover for a scanned page
+    OCR_WORKERS: int = 1  # Concurrent tesseract processes per document (1 = OCR inline)
+    OCR_BATCH_SIZE: int = 1  # Scanned pages recognized per tesseract call
+    OCR_DPI: int = 300  # Resolution scanned pages are rendered at
+    OCR_ADAPTIVE: bool = False  # Try OCR_LOW_DPI first, fall back to OCR_DPI on low confidence
+    OCR_LOW_DPI: int = 150
+    OCR_MIN_CONFIDENCE: float = 70.0  # Mean word confidence (0-100) accepted at OCR_LOW_DPI
+    OCR_LANGUAGE: str = "eng"  # Tesseract language(s), e.g. "eng+jpn"
+    OCR_CONFIG: str = ""  # Extra tesseract options, e.g. "--oem 1 --psm 3"
+    OCR_CACHE_DIR: str = ""  # Persistent OCR text cache; empty disables it
+    OCR_CACHE_MAX_MB: int = 256
+
+    # Output
+    OUTPUT_SINK: str = "json"  # json (one file per PDF), jsonl or sqlite
+    SINK_BATCH_SIZE: int = 100  # Documents buffered between sink flushes/commits
+    WRITE_METRICS: bool = False  # Write metrics.jsonl and run_summary.json to the output directory
+
+    # Streaming mode: consume pages as they are parsed, keep only heading candidates
+    STREAMING: bool = False
+
+    # Heading-only mode: never materialise spans too small to be heading candidates
+    HEADINGS_ONLY: bool = False
+    HEADINGS_ONLY_SAMPLE_PAGES: int = 5  # Pages sampled for the body font size (also streaming)
+
+    # Preview
+    PREVIEW_PAGES: int = 10  # Pages parsed for an outline preview (title and first-level headings)
+
+    # Result cache: reuse outlines of PDFs already processed with the same settings
+    RESULT_CACHE_DIR: str = ""  # Empty disables the cache
+    RESULT_CACHE_MAX_MB: int = 1024
 
     @classmethod
     def load(cls):
@@ -5,6 +5,9 @@ This package contains the core logic for parsing PDFs, detecting headings,
 and building structured outlines.
 """
 
+# Bump whenever a change alters extracted outlines; cached results are keyed on it
+__version__ = "1.3.1"
+
 from .pdf_parser import PDFParser
 from .heading_detector import HeadingDetector
 from .outline_builder import OutlineBuilder
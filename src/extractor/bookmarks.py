@@ -0,0 +1,66 @@
+"""
+Bookmarks - Read a PDF's embedded outline (bookmark tree) as heading entries.
+
+Many PDFs already carry an outline written by the authoring tool. When it
+looks trustworthy it is used as is, and the document's text does not have to
+be extracted or scored at all. Bookmark trees exported by some tools are
+useless, though (a single entry named after the file, every entry pointing at
+page 1, broken destinations), so a tree is only used if it passes a few
+plausibility checks.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+Bookmark = Tuple[int, str, int]  # (level, title, 1-based page)
+
+_MIN_VALID_FRACTION = 0.9  # Entries with a title and a destination inside the document
+_MIN_ORDERED_FRACTION = 0.8  # Consecutive entries whose pages do not go backwards
+_MIN_PAGES_FOR_SPREAD = 5  # Longer documents need bookmarks on more than one page
+
+
+def read_bookmarks(pdf_doc: fitz.Document, pages: range,
+                   min_entries: int = 2) -> Optional[List[Bookmark]]:
+    """
+    Return the document's bookmarks within the given pages, or None if it has
+    no plausible bookmark tree.
+
+    Args:
+        pdf_doc: The open document
+        pages: 0-based page indices whose bookmarks are returned
+        min_entries: Minimum number of bookmarks for the tree to be used
+
+    Returns:
+        (level, title, page) entries in bookmark order, with levels clamped to 1-3
+    """
+    toc = pdf_doc.get_toc(simple=True)
+    if not toc or not _is_plausible(toc, len(pdf_doc), min_entries):
+        return None
+    return [(min(level, 3), title.strip(), page) for level, title, page in toc
+            if title.strip() and pages.start < page <= pages.stop]
+
+
+def _is_plausible(toc: List[list], page_count: int, min_entries: int) -> bool:
+    """Check that a bookmark tree looks like a real outline of the document."""
+    if len(toc) < min_entries:
+        logger.debug(f"Ignoring bookmarks: only {len(toc)} entries")
+        return False
+
+    valid_pages = [page for _, title, page in toc if title.strip() and 1 <= page <= page_count]
+    if len(valid_pages) < _MIN_VALID_FRACTION * len(toc):
+        logger.debug("Ignoring bookmarks: too many entries without a title or a valid destination")
+        return False
+
+    ordered = sum(a <= b for a, b in zip(valid_pages, valid_pages[1:]))
+    if len(valid_pages) > 1 and ordered < _MIN_ORDERED_FRACTION * (len(valid_pages) - 1):
+        logger.debug("Ignoring bookmarks: entries are not in page order")
+        return False
+
+    if page_count >= _MIN_PAGES_FOR_SPREAD and len(set(valid_pages)) == 1:
+        logger.debug("Ignoring bookmarks: every entry points to the same page")
+        return False
+    return True
@@ -0,0 +1,98 @@
+"""
+Disk Cache - Size-bounded, content-addressed key/value store on the filesystem.
+
+Entries are plain files named after their key and sharded by the first two
+characters. Reads refresh the file's modification time, so evicting the
+oldest files first gives least-recently-used behaviour. Writes go through a
+temporary file and an atomic rename, which keeps the cache safe to share
+between the worker processes of a batch run.
+"""
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """
+    Persistent byte cache with least-recently-used eviction.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._size = self._scan_size()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached bytes for key, or None on a miss."""
+        path = self._path_for(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # Mark as recently used
+            return data
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Could not read cache entry {key}: {e}")
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store bytes under key, evicting old entries if the cache grows too large."""
+        path = self._path_for(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {key}: {e}")
+            return
+
+        self._size += len(data)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """Delete least-recently-used entries until the cache fits in max_bytes."""
+        entries = []
+        for path in self.cache_dir.glob("*/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # Removed concurrently by another process
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        # Evict down to 90% of the limit so that eviction doesn't run on every put
+        target = self.max_bytes * 0.9
+        removed = 0
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= target:
+                break
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+
+        self._size = total
+        logger.debug(f"Evicted {removed} entries from cache {self.cache_dir}")
+
+    def _path_for(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def _scan_size(self) -> int:
+        total = 0
+        for path in self.cache_dir.glob("*/*"):
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
@@ -0,0 +1,96 @@
+"""
+Document Statistics - Accumulate font statistics while spans are extracted.
+
+Every text-layer span is folded in as it is read from the page, so the
+document-wide statistics are ready when extraction finishes, without another
+pass over the spans or any intermediate lists. This also covers the streaming
+parse mode, where pages are discarded as soon as they have been consumed, and
+the heading-only mode, where most spans are never turned into text blocks.
+"""
+
+import math
+from collections import Counter
+
+from models.document import Document
+
+
+class DocumentStatsAccumulator:
+    """
+    Running font statistics over the text-layer spans of a document.
+
+    The average font size is the mean over spans, which the heading detector's
+    thresholds are tuned to. A histogram of font size to number of characters
+    gives the character-weighted median, standard deviation and mode (the body
+    text size); the primary font is the family with the most characters. OCR
+    lines carry placeholder font data and are never added.
+    """
+
+    def __init__(self):
+        self.span_count = 0
+        self.skipped_spans = 0  # Counted but dropped below the heading-only size floor
+        self._size_total = 0.0
+        self._size_count = 0
+        self._char_sizes = Counter()  # Font size -> characters set in it
+        self._families = Counter()  # Family -> characters, in order of first appearance
+
+    def add_span(self, size: float, family: str, chars: int = 1) -> None:
+        """Count one text-layer span of chars characters."""
+        self.span_count += 1
+        if size > 0:
+            self._size_total += size
+            self._size_count += 1
+            self._char_sizes[size] += chars
+        self._families[family] += chars
+
+    def merge(self, other: "DocumentStatsAccumulator") -> None:
+        """Fold in the statistics of another accumulator, e.g. from a page worker."""
+        self.span_count += other.span_count
+        self.skipped_spans += other.skipped_spans
+        self._size_total += other._size_total
+        self._size_count += other._size_count
+        self._char_sizes.update(other._char_sizes)
+        self._families.update(other._families)
+
+    @property
+    def avg_font_size(self) -> float:
+        """Mean font size over spans seen so far (12.0 until a sized span has been seen)."""
+        return self._size_total / self._size_count if self._size_count else 12.0
+
+    @property
+    def median_font_size(self) -> float:
+        """Character-weighted median font size."""
+        half = sum(self._char_sizes.values()) / 2
+        seen = 0
+        for size in sorted(self._char_sizes):
+            seen += self._char_sizes[size]
+            if seen >= half:
+                return size
+        return 0.0
+
+    @property
+    def font_size_std(self) -> float:
+        """Character-weighted standard deviation of the font size."""
+        chars = sum(self._char_sizes.values())
+        if not chars:
+            return 0.0
+        mean = sum(size * n for size, n in self._char_sizes.items()) / chars
+        variance = sum(n * (size - mean) ** 2 for size, n in self._char_sizes.items()) / chars
+        return math.sqrt(variance)
+
+    @property
+    def body_font_size(self) -> float:
+        """The font size most characters are set in (the smaller one on a tie)."""
+        if not self._char_sizes:
+            return 0.0
+        return min(self._char_sizes, key=lambda size: (-self._char_sizes[size], size))
+
+    def apply(self, document: Document) -> None:
+        """Write the current statistics onto the document."""
+        if not self.span_count:
+            return
+        document.avg_font_size = self.avg_font_size
+        document.median_font_size = self.median_font_size
+        document.font_size_std = self.font_size_std
+        document.body_font_size = self.body_font_size
+        if self._families:
+            document.primary_font = self._families.most_common(1)[0][0]
@@ -4,13 +4,15 @@ Supports different strategies for different languages.
 """
 import re
 import logging
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterable
 from collections import defaultdict
 import numpy as np
 
-from models.document import Document, TextBlock
+from models.document import Document, FontInfo, TextBlock
+from models.span_table import SpanTable
 from config.settings import Settings
 from models.outline import Heading
+from .line_coalescing import merge_heading_lines
 
 logger = logging.getLogger(__name__)
 
@@ -23,38 +25,148 @@ class HeadingDetector:
         # Japanese Heuristics
         self._jpn_keywords = self._load_japanese_keywords()
         self._jpn_numbering = self._compile_japanese_numbering()
+        self._style_scores: Dict[str, float] = {}
 
-    def detect_headings(self, document: Document) -> List[Heading]:
+    def detect_headings(self, document: Document, max_level: int = 3) -> List[Heading]:
         """
         Router function to call the appropriate heading detector based on language.
+        Headings below max_level (e.g. 1 for H1 only) are not returned.
         """
+        if document.bookmarks is not None:
+            return self._headings_from_bookmarks(document, max_level)
         logger.info(f"Starting heading detection for {document.filename} (lang: {document.language})")
         
         if document.language == 'japanese':
-            return self._detect_headings_japanese(document)
+            return self._detect_headings_japanese(document, max_level)
         else:
-            return self._detect_headings_english(document)
+            return self._detect_headings_english(document, max_level)
+
+    def detect_preview(self, document: Document) -> List[Heading]:
+        """
+        Preview mode: the title and first-level headings of a document that
+        was parsed only up to its first pages (PDFParser.parse with max_pages).
+        The largest heading size class is taken to be the title, so the two
+        largest classes are returned; of bookmarks, only the top level is.
+        Levels are relative to the parsed pages, so they can differ from a
+        full parse.
+        """
+        if document.bookmarks is not None:
+            return self._headings_from_bookmarks(document, max_level=1)
+        return self.detect_headings(document, max_level=2)
+
+    def detect_headings_streaming(self, document: Document,
+                                  page_batches: Iterable[List[TextBlock]]) -> List[Heading]:
+        """
+        Detect headings while pages are still being parsed.
+
+        page_batches is typically PDFParser.iter_page_batches(). Only blocks that
+        can still become candidates are retained: blocks below the heading
+        floor the parser sampled from the whole document (candidate_floor) are
+        dropped as they arrive, and the final candidate filter runs with the
+        exact document statistics after the last page. Unlike the running
+        average, the sampled floor does not follow large text at the start of
+        a document. Japanese scoring considers every block, so nothing can be
+        dropped early for Japanese documents.
+        """
+        logger.info(f"Starting streaming heading detection for {document.filename} "
+                    f"(lang: {document.language})")
+
+        metrics = document.metrics
+        retained, seen = [], 0
+        for page_blocks in page_batches:
+            seen += len(page_blocks)
+            if document.language == 'japanese':
+                retained.extend(page_blocks)
+                continue
+            with metrics.stage("candidate_filtering"):
+                retained.extend(self._page_survivors(page_blocks, document.candidate_floor))
+        # The parser fills document.bookmarks, and yields no pages, when it uses them
+        if document.bookmarks is not None:
+            return self._headings_from_bookmarks(document)
+        if 0 < document.avg_font_size < document.candidate_floor:
+            logger.warning(f"Average font size {document.avg_font_size:.2f} of {document.filename} "
+                           f"is below the sampled floor {document.candidate_floor:.2f}; "
+                           f"smaller headings may be missing")
+
+        if document.language == 'japanese':
+            candidates = retained
+            with metrics.stage("scoring"):
+                scored_candidates = self._score_candidates_japanese(candidates, document)
+        else:
+            with metrics.stage("candidate_filtering"):
+                min_size = document.avg_font_size or 12.0
+                candidates = self._merge_lines(
+                    [b for b in retained if self._is_candidate_english(b, min_size)])
+            with metrics.stage("scoring"):
+                scored_candidates = self._score_candidates_english(candidates, document)
+        metrics.count("candidates", len(candidates))
+        final_headings = self._finalize_headings(scored_candidates, document)
+
+        logger.info(f"Detected {len(final_headings)} headings from {seen} streamed blocks.")
+        return final_headings
+
+    def _page_survivors(self, page_blocks: Iterable[TextBlock],
+                        min_size: float) -> Iterable[TextBlock]:
+        """
+        The blocks of one streamed page that can still become candidates. Rows
+        of a page's SpanTable are copied into a table of their own, so that
+        retaining them does not keep the whole page table alive.
+        """
+        if not isinstance(page_blocks, SpanTable):
+            return [b for b in page_blocks if self._is_candidate_english(b, min_size)]
+        # Apply the size test on the column first; only larger spans are read as rows
+        keep = page_blocks.size >= min_size
+        keep[keep] = [self._is_candidate_english(b, min_size)
+                      for b in page_blocks.take(np.flatnonzero(keep))]
+        return page_blocks.select(keep) if keep.any() else []
+
+    def _headings_from_bookmarks(self, document: Document, max_level: int = 3) -> List[Heading]:
+        """Turn the bookmarks the parser read from the PDF into headings, in bookmark order."""
+        font_info = FontInfo(family="Bookmark", size=0.0, flags=0, color="#000000")
+        headings = [
+            Heading(text=title, level=level, page=page, confidence=1.0, font_info=font_info,
+                    position=(0.0, 0.0))
+            for level, title, page in document.bookmarks if level <= max_level
+        ]
+        document.metrics.count("headings", len(headings))
+        logger.info(f"Using {len(headings)} bookmarks as headings for {document.filename}.")
+        return headings
 
     # --- English Heading Detection Logic (Your existing logic) ---
 
-    def _detect_headings_english(self, document: Document) -> List[Heading]:
-        candidates = self._identify_candidates_english(document)
-        scored_candidates = self._score_candidates_english(candidates, document)
-        headings = self._classify_heading_levels(scored_candidates)
-        final_headings = self._post_process_headings(headings)
+    def _detect_headings_english(self, document: Document, max_level: int = 3) -> List[Heading]:
+        metrics = document.metrics
+        with metrics.stage("candidate_filtering"):
+            candidates = self._identify_candidates_english(document)
+        metrics.count("candidates", len(candidates))
+        with metrics.stage("scoring"):
+            scored_candidates = self._score_candidates_english(candidates, document)
+        final_headings = self._finalize_headings(scored_candidates, document, max_level)
         
         logger.info(f"Detected {len(final_headings)} English headings.")
         return final_headings
 
     def _identify_candidates_english(self, document: Document) -> List[TextBlock]:
-        candidates = []
-        for block in document.text_blocks:
-            text = block.text.strip()
-            if not text or len(text) > self.settings.MAX_HEADING_LENGTH: continue
-            if block.font_info.size < (document.avg_font_size or 12.0): continue
-            if text.endswith(('.', '!', '?', ';', ':')) and len(text) > 20: continue
-            candidates.append(block)
-        return candidates
+        min_size = document.avg_font_size or 12.0
+        blocks = document.text_blocks
+        if isinstance(blocks, SpanTable):
+            # Apply the size test on the column first; only larger spans are copied out as rows
+            blocks = blocks.select(blocks.size >= min_size)
+        return self._merge_lines(
+            [block for block in blocks if self._is_candidate_english(block, min_size)])
+
+    def _merge_lines(self, candidates: List[TextBlock]) -> List[TextBlock]:
+        """With MERGE_HEADING_LINES, join candidates that wrap onto the next line."""
+        if not self.settings.MERGE_HEADING_LINES:
+            return candidates
+        return merge_heading_lines(candidates, self.settings.MAX_HEADING_LENGTH)
+
+    def _is_candidate_english(self, block: TextBlock, min_size: float) -> bool:
+        text = block.text.strip()
+        if not text or len(text) > self.settings.MAX_HEADING_LENGTH: return False
+        if block.font_info.size < min_size: return False
+        if text.endswith(('.', '!', '?', ';', ':')) and len(text) > 20: return False
+        return True
     
     def _score_candidates_english(self, candidates: List[TextBlock], document: Document) -> List[Tuple[TextBlock, float]]:
         """Score candidates for English documents."""
@@ -76,7 +188,7 @@ class HeadingDetector:
 
     # --- Japanese Heading Detection Logic (NEW) ---
 
-    def _detect_headings_japanese(self, document: Document) -> List[Heading]:
+    def _detect_headings_japanese(self, document: Document, max_level: int = 3) -> List[Heading]:
         """
         A dedicated set of heuristics for detecting headings in Japanese documents.
         This is a starting point and can be expanded.
@@ -84,9 +196,13 @@ class HeadingDetector:
         # NOTE: Japanese heuristics are different. Font size is still important,
         # but keywords and numbering patterns are key.
         candidates = document.text_blocks # Start with all blocks
-        scored_candidates = self._score_candidates_japanese(candidates, document)
-        headings = self._classify_heading_levels(scored_candidates)
-        final_headings = self._post_process_headings(headings)
+        document.metrics.count("candidates", len(candidates))
+        with document.metrics.stage("scoring"):
+            scored_candidates = self._score_candidates_japanese(candidates, document)
+        final_headings = self._finalize_headings(scored_candidates, document, max_level)
+        if isinstance(candidates, SpanTable):
+            # Every row was read; don't keep the column lists alive with the document
+            candidates.release_lists()
         
         logger.info(f"Detected {len(final_headings)} Japanese headings.")
         return final_headings
@@ -110,6 +226,14 @@ class HeadingDetector:
 
     # --- Common Helper Functions ---
 
+    def _finalize_headings(self, scored_candidates, document, max_level=3):
+        with document.metrics.stage("level_classification"):
+            headings = self._classify_heading_levels(scored_candidates, max_level)
+        with document.metrics.stage("post_processing"):
+            final_headings = self._post_process_headings(headings)
+        document.metrics.count("headings", len(final_headings))
+        return final_headings
+
     def _calculate_font_size_score(self, block, doc):
         ratio = block.font_info.size / (doc.avg_font_size or 12.0)
         if ratio > 1.5: return 1.0
@@ -118,10 +242,15 @@ class HeadingDetector:
         return 0.2
 
     def _calculate_font_style_score(self, block, doc):
-        score = 0
-        font_name = block.font_info.family.lower()
-        if any(w in font_name for w in ['bold', 'black', 'heavy', 'gothicb']): score += 0.8
-        return min(score, 1.0)
+        # Depends only on the font, so it is computed once per family
+        family = block.font_info.family
+        score = self._style_scores.get(family)
+        if score is None:
+            score = 0
+            font_name = family.lower()
+            if any(w in font_name for w in ['bold', 'black', 'heavy', 'gothicb']): score += 0.8
+            score = self._style_scores[family] = min(score, 1.0)
+        return score
         
     def _calculate_position_score(self, block, doc):
         # This is less reliable for Japanese, so it's only used for English
@@ -137,7 +266,7 @@ class HeadingDetector:
     def _calculate_keyword_score(self, block, keyword_set):
         return 1 if any(keyword in block.text for keyword in keyword_set) else 0
 
-    def _classify_heading_levels(self, scored_candidates):
+    def _classify_heading_levels(self, scored_candidates, max_level=3):
         if not scored_candidates: return []
         size_groups = defaultdict(list)
         for block, score in scored_candidates:
@@ -145,7 +274,7 @@ class HeadingDetector:
         
         sorted_sizes = sorted(size_groups.keys(), reverse=True)
         headings = []
-        for i, size in enumerate(sorted_sizes[:3]):
+        for i, size in enumerate(sorted_sizes[:min(max_level, 3)]):
             level = i + 1
             for block, confidence in size_groups[size]:
                 headings.append(Heading(
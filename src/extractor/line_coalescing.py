@@ -0,0 +1,115 @@
+"""
+Line Coalescing - Merge the spans of a text line into one line-level block.
+
+PyMuPDF reports text as spans, and a new span starts wherever the font, size,
+colour or even just the kerning changes, so one visual line ("1.", "Intro",
+"duction") often arrives in several pieces. Scored separately, each piece is a
+heading candidate of its own, and none of them carries the whole heading text.
+Coalescing joins consecutive spans of the same line with a compatible size and
+weight into one block before heading detection, on the columns of a page's
+SpanTable, and can also join a heading that wraps over several lines.
+"""
+
+from typing import List
+
+import numpy as np
+
+from models.document import FontInfo, TextBlock
+from models.span_table import SpanTable
+
+_BOLD_FLAG = 16  # PyMuPDF span flag for a bold font
+_SIZE_TOLERANCE = 0.5  # Points two spans may differ in size and still be one run
+_SPACE_GAP = 0.1  # Horizontal gap, as a fraction of the font size, that marks a word break
+_LINE_GAP = 0.6  # Vertical gap, as a fraction of the font size, between lines of one heading
+
+
+def coalesce_lines(table: SpanTable, line_ids: np.ndarray) -> SpanTable:
+    """
+    Merge runs of consecutive spans that share a line and have a compatible
+    font size and weight.
+
+    Args:
+        table: Spans in reading order, usually those of one page
+        line_ids: For every span, an id of the text line it belongs to
+
+    Returns:
+        A table with one row per run. A run's box covers all of its spans, its
+        font, size, flags and colour are those of its first span, and its text
+        joins the spans' text, with a space where they are visibly apart or
+        where whitespace was stripped from either side of the join.
+    """
+    count = len(table)
+    if count < 2:
+        return table
+    bold = (table.flags & _BOLD_FLAG) != 0
+    right = table.x + table.width
+    bottom = table.y + table.height
+
+    breaks = np.ones(count, dtype=bool)
+    breaks[1:] = ((line_ids[1:] != line_ids[:-1]) | (table.page[1:] != table.page[:-1])
+                  | (np.abs(np.diff(table.size)) > _SIZE_TOLERANCE) | (bold[1:] != bold[:-1]))
+    starts = np.flatnonzero(breaks)
+    if len(starts) == count:
+        return table
+
+    # Span text is stripped during extraction, so the space between words is put back. A
+    # trailing space ("1. ") lies inside its span's box, so touching spans may still be words apart
+    spaced = np.zeros(count, dtype=bool)
+    spaced[1:] = ~breaks[1:] & ((table.x[1:] - right[:-1] > _SPACE_GAP * table.size[1:])
+                                | table.space_after[:-1] | table.space_before[1:])
+    lengths = np.diff(table.text_offsets) + spaced
+    text_offsets = np.zeros(len(starts) + 1, dtype=np.int64)
+    np.cumsum(np.add.reduceat(lengths, starts), out=text_offsets[1:])
+    offsets = table.text_offsets.tolist()
+    text_buffer = "".join(
+        " " + table.text_buffer[a:b] if space else table.text_buffer[a:b]
+        for a, b, space in zip(offsets[:-1], offsets[1:], spaced.tolist())
+    )
+
+    ends = np.append(starts[1:], count) - 1
+    x = np.minimum.reduceat(table.x, starts)
+    y = np.minimum.reduceat(table.y, starts)
+    return SpanTable(
+        page=table.page[starts], x=x, y=y,
+        width=np.maximum.reduceat(right, starts) - x,
+        height=np.maximum.reduceat(bottom, starts) - y,
+        size=table.size[starts], flags=table.flags[starts], font_id=table.font_id[starts],
+        color=table.color[starts], space_before=table.space_before[starts],
+        space_after=table.space_after[ends], text_offsets=text_offsets, text_buffer=text_buffer,
+        fonts=table.fonts,
+    )
+
+
+def merge_heading_lines(candidates: List[TextBlock], max_length: int) -> List[TextBlock]:
+    """
+    Join heading candidates that continue each other on the next line: same
+    page and font, left edges or centres within one font size of each other,
+    and at most _LINE_GAP font sizes of space in between. Candidates must be
+    in reading order; merged text longer than max_length is left split.
+    """
+    merged: List[TextBlock] = []
+    for block in candidates:
+        previous = merged[-1] if merged else None
+        if previous is not None and _continues(previous, block) \
+                and len(previous.text) + 1 + len(block.text) <= max_length:
+            left = min(previous.x, block.x)
+            merged[-1] = TextBlock(
+                text=f"{previous.text} {block.text}", page=previous.page, x=left, y=previous.y,
+                width=max(previous.x + previous.width, block.x + block.width) - left,
+                height=block.y + block.height - previous.y, font_info=previous.font_info,
+            )
+        else:
+            merged.append(block)
+    return merged
+
+
+def _continues(previous: TextBlock, block: TextBlock) -> bool:
+    """Whether block is the next line of the heading that previous ends with."""
+    font: FontInfo = previous.font_info
+    if block.page != previous.page or block.font_info != font:
+        return False
+    gap = block.y - (previous.y + previous.height)
+    if not -0.1 * font.size <= gap <= _LINE_GAP * font.size:
+        return False
+    centre_offset = (block.x + block.width / 2) - (previous.x + previous.width / 2)
+    return abs(block.x - previous.x) <= font.size or abs(centre_offset) <= font.size
@@ -0,0 +1,301 @@
+"""
+OCR Engine - Render scanned pages and recognize their text with Tesseract.
+
+Rendering touches the PyMuPDF document and must happen on the thread that owns
+it; recognition only needs the rendered pixmap and runs tesseract as a
+subprocess, so it can be handed to a thread pool.
+
+Pages are rendered as 8-bit grayscale without alpha and passed to tesseract
+as a binary PGM file written straight from the pixmap's sample buffer, so
+there is no PNG encode/decode round trip and no intermediate PIL copy.
+
+Recognized text can be kept in a persistent OCR cache keyed by what the page
+draws (its content stream and the raw bytes of the images and forms it uses)
+and the OCR parameters, so re-running a scanned corpus with different heading
+settings does not send any page through tesseract twice.
+
+In adaptive mode a page is first recognized at OCR_LOW_DPI. If the mean word
+confidence reported by tesseract is below OCR_MIN_CONFIDENCE, the result is
+discarded and the page is rendered and recognized again at OCR_DPI.
+
+OCRBatcher groups up to OCR_BATCH_SIZE pages into one tesseract call through
+an image list file, so process start-up and model loading are paid once per
+batch instead of once per page.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from functools import partial
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+import pytesseract
+
+from models.document import TextBlock, FontInfo
+from config.settings import Settings
+from .disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+# A rendered page queued for recognition: (pixmap, page number, page width, cache key)
+OCRPage = Tuple[fitz.Pixmap, int, float, Optional[str]]
+
+
+class OCREngine:
+    """
+    Tesseract-based text recognition for pages without a usable text layer.
+    NOTE: This loses detailed font and position info for individual words.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.cache = None
+        if settings.OCR_CACHE_DIR:
+            self.cache = DiskCache(Path(settings.OCR_CACHE_DIR),
+                                   settings.OCR_CACHE_MAX_MB * 1024 * 1024)
+        # (dpi, min_confidence) per attempt; None accepts whatever the pass returns
+        self.passes: List[Tuple[int, Optional[float]]] = [(settings.OCR_DPI, None)]
+        if settings.OCR_ADAPTIVE and settings.OCR_LOW_DPI < settings.OCR_DPI:
+            self.passes.insert(0, (settings.OCR_LOW_DPI, settings.OCR_MIN_CONFIDENCE))
+        self._params = f"{self.passes}:{settings.OCR_LANGUAGE}:{settings.OCR_CONFIG}"
+
+    def render_page(self, page: fitz.Page, dpi: Optional[int] = None) -> fitz.Pixmap:
+        """Render a page to a grayscale pixmap suitable for OCR."""
+        return page.get_pixmap(dpi=dpi or self.settings.OCR_DPI, colorspace=fitz.csGRAY,
+                               alpha=False)
+
+    def cache_key(self, page: fitz.Page) -> Optional[str]:
+        """
+        Compute the OCR cache key of a page, or None if the cache is disabled.
+        Reads the PDF, so it must run on the thread that owns the document.
+        """
+        if self.cache is None:
+            return None
+        doc = page.parent
+        digest = hashlib.sha256(self._params.encode('utf-8'))
+        digest.update(f"{tuple(page.rect)}:{page.rotation}".encode('ascii'))
+        digest.update(page.read_contents())
+        # Image and form xrefs are only meaningful within one file; hash their bytes instead
+        xrefs = ([img[0] for img in page.get_images(full=True)]
+                 + [xobj[0] for xobj in page.get_xobjects()])
+        for xref in xrefs:
+            digest.update(doc.xref_stream_raw(xref) or b"")
+        return digest.hexdigest()
+
+    def lookup(self, key: Optional[str], page_num: int,
+               page_width: float) -> Optional[List[TextBlock]]:
+        """Return the cached OCR result for a page key, or None on a miss."""
+        if key is None:
+            return None
+        data = self.cache.get(key)
+        if data is None:
+            return None
+        logger.debug(f"OCR cache hit for page {page_num}")
+        return self._text_to_blocks(data.decode('utf-8'), page_num, page_width)
+
+    def recognize(self, pix: fitz.Pixmap, page_num: int, page_width: float,
+                  cache_key: Optional[str] = None,
+                  min_confidence: Optional[float] = None) -> Optional[List[TextBlock]]:
+        """
+        Run tesseract on a rendered page and return one text block per recognized line.
+
+        With min_confidence, returns None instead if the mean word confidence of
+        the page is below it, so the caller can retry at a higher resolution.
+        """
+        return self.recognize_batch([(pix, page_num, page_width, cache_key)], min_confidence)[0]
+
+    def recognize_batch(self, pages: List[OCRPage],
+                        min_confidence: Optional[float] = None) -> List[Optional[List[TextBlock]]]:
+        """
+        recognize() for several pages with a single tesseract call, which pays
+        the process start and model load once. pages holds (pixmap, page number,
+        page width, cache key) tuples; results are returned in the same order.
+        """
+        page_nums = ", ".join(str(page_num) for _, page_num, _, _ in pages)
+        try:
+            # Use pytesseract to get text data
+            with ExitStack() as stack:
+                image_paths = [stack.enter_context(_pgm_file(pix)) for pix, _, _, _ in pages]
+                if len(image_paths) == 1:
+                    image_path = image_paths[0]
+                else:
+                    # Tesseract reads a .txt input as a list of images, one page each
+                    image_path = stack.enter_context(_image_list_file(image_paths))
+                if min_confidence is None:
+                    texts = self._recognize_text(image_path, len(pages))
+                    confidences = [None] * len(pages)
+                else:
+                    texts, confidences = self._recognize_with_confidence(image_path, len(pages))
+        except Exception as e:
+            logger.error(f"OCR failed for page {page_nums}: {e}")
+            return [[] for _ in pages]
+
+        results = []
+        for page, ocr_text, confidence in zip(pages, texts, confidences):
+            pix, page_num, page_width, cache_key = page
+            if confidence is not None and confidence < min_confidence:
+                logger.debug(f"OCR confidence {confidence:.0f} on page {page_num} at "
+                             f"{pix.xres} dpi is below {min_confidence:.0f}; retrying")
+                results.append(None)
+                continue
+            if cache_key is not None:
+                self.cache.put(cache_key, ocr_text.encode('utf-8'))
+            ocr_blocks = self._text_to_blocks(ocr_text, page_num, page_width)
+            if ocr_blocks:
+                logger.debug(f"Successfully extracted {len(ocr_blocks)} lines of text "
+                             f"via OCR from page {page_num}")
+            results.append(ocr_blocks)
+        return results
+
+    def recognize_batch_timed(self, pages: List[OCRPage], min_confidence: Optional[float] = None
+                              ) -> Tuple[List[Optional[List[TextBlock]]], float, float]:
+        """recognize_batch() for pool threads: also returns the wall and thread CPU time it took."""
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        results = self.recognize_batch(pages, min_confidence)
+        return results, time.perf_counter() - wall_start, time.thread_time() - cpu_start
+
+    def _recognize_text(self, image_path: str, page_count: int) -> List[str]:
+        """Recognize an image or image list and return the plain text of each page."""
+        ocr_text = pytesseract.image_to_string(
+            image_path, lang=self.settings.OCR_LANGUAGE, config=self.settings.OCR_CONFIG
+        )
+        if page_count == 1:
+            return [ocr_text]
+        # Tesseract ends every page with a form feed
+        texts = ocr_text.split("\f")
+        if len(texts) < page_count:
+            raise ValueError(f"expected {page_count} pages of OCR output, got {len(texts)}")
+        return texts[:page_count]
+
+    def _recognize_with_confidence(self, image_path: str,
+                                   page_count: int) -> Tuple[List[str], List[float]]:
+        """
+        Recognize an image or image list and return each page's text and mean
+        word confidence (0-100).
+        """
+        data = pytesseract.image_to_data(
+            image_path, lang=self.settings.OCR_LANGUAGE, config=self.settings.OCR_CONFIG,
+            output_type=pytesseract.Output.DICT
+        )
+        lines = [{} for _ in range(page_count)]
+        confidences = [[] for _ in range(page_count)]
+        for i, word in enumerate(data["text"]):
+            conf = float(data["conf"][i])
+            if conf < 0 or not word.strip():
+                continue  # Layout rows (pages, blocks, lines) have no confidence
+            page = data["page_num"][i] - 1
+            confidences[page].append(conf)
+            line_id = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            lines[page].setdefault(line_id, []).append(word.strip())
+        texts = ["\n".join(" ".join(words) for words in page_lines.values())
+                 for page_lines in lines]
+        # An empty result may just be text too small for this resolution
+        means = [sum(confs) / len(confs) if confs else 0.0 for confs in confidences]
+        return texts, means
+
+    def _text_to_blocks(self, ocr_text: str, page_num: int, page_width: float) -> List[TextBlock]:
+        """Turn tesseract's plain text output into one text block per line."""
+        ocr_blocks = []
+        if ocr_text.strip():
+            # Since OCR doesn't give us font info, we create one large text block
+            # for the whole page with default font properties.
+            default_font = FontInfo(family="OCR", size=12.0, flags=0, color="#000000")
+            
+            # We can split the text by line to create multiple blocks
+            for line in ocr_text.splitlines():
+                if line.strip():
+                    ocr_blocks.append(TextBlock(
+                        text=line.strip(),
+                        page=page_num,
+                        x=0, y=0, # Position is unknown from OCR
+                        width=page_width, height=12, # A-best guess for height
+                        font_info=default_font
+                    ))
+        return ocr_blocks
+
+
+class OCRBatcher:
+    """
+    Collects rendered pages and recognizes them batch_size at a time on a
+    thread pool. submit() returns a Future per page, resolving to
+    (blocks, wall, cpu) with the batch's time split evenly across its pages.
+    Pages with different confidence floors never share a batch.
+    """
+
+    def __init__(self, engine: OCREngine, pool: ThreadPoolExecutor, batch_size: int):
+        self.engine = engine
+        self.pool = pool
+        self.batch_size = max(1, batch_size)
+        self._pages: List[OCRPage] = []
+        self._futures: List[Future] = []
+        self._min_confidence: Optional[float] = None
+
+    def submit(self, pix: fitz.Pixmap, page_num: int, page_width: float,
+               cache_key: Optional[str] = None, min_confidence: Optional[float] = None) -> Future:
+        """Queue a page for recognition; the batch is sent once it is full."""
+        if self._pages and min_confidence != self._min_confidence:
+            self.flush()
+        self._min_confidence = min_confidence
+        future = Future()
+        self._pages.append((pix, page_num, page_width, cache_key))
+        self._futures.append(future)
+        if len(self._pages) >= self.batch_size:
+            self.flush()
+        return future
+
+    def flush(self) -> None:
+        """Send the queued pages to the pool, even if the batch is not full."""
+        if not self._pages:
+            return
+        pages, futures = self._pages, self._futures
+        self._pages, self._futures = [], []
+        batch = self.pool.submit(self.engine.recognize_batch_timed, pages, self._min_confidence)
+        batch.add_done_callback(partial(_resolve_batch, futures))
+
+
+def _resolve_batch(futures: List[Future], batch: Future) -> None:
+    """Hand a finished batch's per-page results to the futures of its pages."""
+    try:
+        results, wall, cpu = batch.result()
+    except Exception as e:
+        for future in futures:
+            future.set_exception(e)
+        return
+    for future, blocks in zip(futures, results):
+        future.set_result((blocks, wall / len(futures), cpu / len(futures)))
+
+
+@contextmanager
+def _pgm_file(pix: fitz.Pixmap) -> Iterator[str]:
+    """Write a grayscale pixmap to a temporary binary PGM file and yield its path."""
+    fd, path = tempfile.mkstemp(prefix="ocr_", suffix=".pgm")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(f"P5\n{pix.width} {pix.height}\n255\n".encode("ascii"))
+            if pix.stride == pix.width:
+                f.write(pix.samples_mv)  # Rows are contiguous: one write, no copy
+            else:
+                samples = pix.samples_mv
+                for row in range(pix.height):
+                    f.write(samples[row * pix.stride:row * pix.stride + pix.width])
+        yield path
+    finally:
+        os.unlink(path)
+
+
+@contextmanager
+def _image_list_file(image_paths: List[str]) -> Iterator[str]:
+    """Write a tesseract image list file, one path per line, and yield its path."""
+    fd, path = tempfile.mkstemp(prefix="ocr_", suffix=".txt")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write("\n".join(image_paths) + "\n")
+        yield path
+    finally:
+        os.unlink(path)
@@ -0,0 +1,79 @@
+"""
+Page Triage - Decide up front how a page's text has to be obtained.
+
+Pages are classified before any full text extraction or rendering:
+
+  * "text":    the text layer is usable as is
+  * "scanned": the page is an image with no text layer; OCR only
+  * "hybrid":  a few visible characters (e.g. a caption or stamp) over a
+               page-sized image; the text layer is kept and OCR adds the rest
+
+The checks run cheapest first. Pages without any image are text pages. Only
+pages whose images cover most of the page have their characters counted,
+which is fast on exactly those pages because they carry little text.
+Invisible text (render mode 3) is the searchable layer a previous OCR run
+left behind, so such pages are treated as text and not OCRed again.
+"""
+
+import logging
+from typing import Tuple
+
+import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+TEXT = "text"
+SCANNED = "scanned"
+HYBRID = "hybrid"
+
+_INVISIBLE_TEXT = 3  # Text render mode "neither fill nor stroke"
+
+
+def classify_page(page: fitz.Page, text_threshold: int = 50, image_coverage: float = 0.5) -> str:
+    """
+    Classify a page as TEXT, SCANNED or HYBRID.
+
+    Args:
+        page: The page to inspect
+        text_threshold: Minimum number of visible characters for a text page
+        image_coverage: Fraction of the page area images must cover before a
+            page with less text is considered scanned
+
+    Returns:
+        One of TEXT, SCANNED, HYBRID
+    """
+    if not page.get_images():
+        return TEXT
+    if _image_coverage(page) < image_coverage:
+        return TEXT
+
+    visible, invisible = _count_chars(page)
+    if invisible >= text_threshold or visible >= text_threshold:
+        return TEXT
+    return HYBRID if visible else SCANNED
+
+
+def _image_coverage(page: fitz.Page) -> float:
+    """Fraction of the page area covered by images (overlaps counted once per image)."""
+    page_rect = page.rect
+    page_area = page_rect.width * page_rect.height
+    if page_area <= 0:
+        return 0.0
+    covered = 0.0
+    for info in page.get_image_info():
+        visible = fitz.Rect(info["bbox"]) & page_rect
+        if not visible.is_empty:
+            covered += visible.width * visible.height
+    return min(1.0, covered / page_area)
+
+
+def _count_chars(page: fitz.Page) -> Tuple[int, int]:
+    """Count the visible and invisible non-whitespace characters of the text layer."""
+    visible = invisible = 0
+    for span in page.get_texttrace():
+        count = sum(1 for char in span["chars"] if not chr(char[0]).isspace())
+        if span["type"] == _INVISIBLE_TEXT or span.get("opacity", 1) == 0:
+            invisible += count
+        else:
+            visible += count
+    return visible, invisible
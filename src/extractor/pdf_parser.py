@@ -3,20 +3,108 @@ PDF Parser - Extract text, font information, and layout data from PDF files.
 Includes OCR fallback for scanned documents.
 """
 
+import functools
 import logging
+import mmap
+import multiprocessing
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+from collections import deque
+from dataclasses import dataclass, field
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List
+from typing import Any, Iterator, List, Optional, Tuple, Union
 import fitz  # PyMuPDF
 import numpy as np
-import pytesseract
-from PIL import Image
-import io
 
-from models.document import Document, TextBlock, FontInfo
+from models.document import Document, TextBlock
+from models.font_registry import FontRegistry
+from models.span_table import SpanTable, SpanTableBuilder
+from models.metrics import DocumentMetrics
+from models.deadline import Deadline
 from config.settings import Settings
+from . import page_triage
+from .bookmarks import read_bookmarks
+from .document_stats import DocumentStatsAccumulator
+from .line_coalescing import coalesce_lines
+from .ocr import OCRBatcher, OCREngine
 
 logger = logging.getLogger(__name__)
 
+# Fraction below a sampled average font size that heading-only spans are kept down to
+_HEADING_FLOOR_MARGIN = 0.01
+
+# A PDF given by its path, or its bytes in any buffer (bytes, memoryview, mmap, ...)
+PDFSource = Union[Path, str, bytes, bytearray, memoryview, mmap.mmap]
+
+# Set in the batch and server pool workers, which parse each document's pages in-process
+_in_pool_worker = False
+
+
+def mark_pool_worker() -> None:
+    """
+    Mark the current process as a document-level pool worker. Its documents
+    are never split across page workers, so a pool of WORKERS processes does
+    not grow to WORKERS x PAGE_WORKERS.
+    """
+    global _in_pool_worker
+    _in_pool_worker = True
+
+
+@functools.lru_cache(maxsize=None)
+def buffer_streams_supported() -> bool:
+    """
+    Whether the installed PyMuPDF opens a PDF from a memoryview in place.
+    PyMuPDF 1.23 only accepts bytes, bytearray and BytesIO streams.
+    """
+    with fitz.open() as probe:
+        probe.new_page()
+        data = probe.tobytes()
+    try:
+        fitz.open(stream=memoryview(data), filetype="pdf").close()
+    except TypeError:
+        return False
+    return True
+
+
+def open_pdf(source: PDFSource) -> fitz.Document:
+    """
+    Open a PDF from a path, or from an in-memory buffer. Buffers are read in
+    place where PyMuPDF supports it (see buffer_streams_supported), and copied
+    to bytes where it does not.
+    """
+    if isinstance(source, (str, Path)):
+        return fitz.open(source)
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    if not buffer_streams_supported():
+        return fitz.open(stream=bytes(source), filetype="pdf")
+    # Other buffers (mmap, ...) are wrapped rather than copied; memoryviews are passed as they are
+    view = source if isinstance(source, memoryview) else memoryview(source)
+    return fitz.open(stream=view, filetype="pdf")
+
+
+def _select_pages(pdf_doc: fitz.Document, pages: Optional[range],
+                  max_pages: Optional[int]) -> range:
+    """Clamp a requested page range to the document and apply max_pages."""
+    selected = range(len(pdf_doc))
+    if pages is not None:
+        if pages.step != 1:
+            raise ValueError(f"pages must be a contiguous range, got {pages}")
+        selected = selected[pages.start:pages.stop]
+    if max_pages is not None:
+        selected = selected[:max(0, max_pages)]
+    return selected
+
+
+def _new_document(source: PDFSource, filename: Optional[str]) -> Document:
+    if isinstance(source, (str, Path)):
+        return Document(filename=filename or Path(source).name, filepath=str(source))
+    return Document(filename=filename or "document.pdf", filepath="")
+
+
 class PDFParser:
     """
     High-performance PDF parser that extracts text blocks with detailed
@@ -25,127 +113,617 @@ class PDFParser:
 
     def __init__(self, settings: Settings):
         self.settings = settings
+        self.ocr = OCREngine(settings)
 
-    def parse(self, pdf_path: Path) -> Document:
+    def parse(self, pdf_path: PDFSource, metrics: Optional[DocumentMetrics] = None,
+              filename: Optional[str] = None, pages: Optional[range] = None,
+              max_pages: Optional[int] = None, deadline: Optional[Deadline] = None) -> Document:
         """
         Parse a PDF file, attempting direct text extraction first, then OCR.
+
+        pdf_path may also be the PDF itself as bytes, a memoryview or an mmap,
+        which is parsed in place where PyMuPDF can read from buffers and
+        copied to bytes where it cannot; filename then names the document.
+        Stage timings and counters are recorded on document.metrics, which is
+        the given metrics object if one is passed.
+
+        pages restricts parsing to a contiguous range of 0-based page indices
+        and max_pages stops after that many pages. Only those pages are read:
+        the text blocks, page dimensions and statistics cover just them, while
+        page_count is still the length of the whole document.
+
+        If the PDF has a plausible bookmark tree (and FORCE_HEURISTICS is off),
+        it is stored on document.bookmarks and no text is extracted at all.
+
+        Once deadline (by default DOCUMENT_TIME_BUDGET from now) has passed, no
+        further pages are parsed and pending OCR is abandoned; the document is
+        then returned with what was parsed so far and partial_reason set.
         """
         try:
-            logger.debug(f"Starting to parse PDF: {pdf_path}")
-            document = Document(filename=pdf_path.name, filepath=str(pdf_path))
+            document = _new_document(pdf_path, filename)
+            logger.debug(f"Starting to parse PDF: {document.filename}")
+            if metrics is not None:
+                document.metrics = metrics
+            document.deadline = deadline or Deadline.from_budget(self.settings.DOCUMENT_TIME_BUDGET)
             
-            with fitz.open(pdf_path) as pdf_doc:
-                document.page_count = len(pdf_doc)
-                document.page_dimensions = [(page.rect.width, page.rect.height) for page in pdf_doc]
+            with document.metrics.stage("parse"), open_pdf(pdf_path) as pdf_doc:
+                selected = _select_pages(pdf_doc, pages, max_pages)
+                if self._read_bookmarks(pdf_doc, document, selected):
+                    return document
+                # Filled in as each page is loaded; pages that are not parsed stay at (0, 0)
+                document.page_dimensions = [(0.0, 0.0)] * document.page_count
                 
-                all_text_blocks = []
-                for page_num, page in enumerate(pdf_doc):
-                    page_number = page_num + 1
-                    text_blocks = self._extract_text_blocks_from_page(page, page_number)
-                    
-                    # If a page has very little text, it's likely scanned. Try OCR.
-                    total_text_length = sum(len(block.text) for block in text_blocks)
-                    if total_text_length < 50: # Threshold for considering a page "scanned"
-                        logger.debug(f"Page {page_number} has little text. Attempting OCR...")
-                        ocr_blocks = self._ocr_page(page, page_number)
-                        all_text_blocks.extend(ocr_blocks)
+                if self.settings.HEADINGS_ONLY:
+                    self._extract_headings_only(pdf_path, pdf_doc, document, selected)
+                else:
+                    stats = DocumentStatsAccumulator()
+                    if self._use_page_workers(len(selected), pdf_path):
+                        all_text_blocks = self._extract_pages_parallel(
+                            pdf_path, selected, document.metrics, stats=stats,
+                            deadline=document.deadline, dimensions=document.page_dimensions)
                     else:
-                        all_text_blocks.extend(text_blocks)
-                        
-                document.text_blocks = all_text_blocks
+                        all_text_blocks = self._extract_page_range(
+                            pdf_doc, selected.start, selected.stop, document.metrics, stats=stats,
+                            deadline=document.deadline, dimensions=document.page_dimensions)
+                            
+                    document.text_blocks = all_text_blocks
+                    stats.apply(document)
+                    logger.debug(f"Document stats - Avg font size: {document.avg_font_size:.1f}, "
+                                 f"Body font size: {document.body_font_size:.1f}, "
+                                 f"Primary font: {document.primary_font}")
 
-            self._calculate_document_stats(document)
-            logger.info(f"Parsed {len(document.text_blocks)} text blocks from {document.page_count} pages")
+            self._finish_store(document.metrics)
+            pages_parsed = self._mark_partial(document, len(selected))
+            document.metrics.count("pages", pages_parsed)
+            document.metrics.count("spans", len(document.text_blocks))
+            logger.info(f"Parsed {len(document.text_blocks)} text blocks from {pages_parsed} of "
+                        f"{document.page_count} pages")
             return document
             
         except Exception as e:
-            logger.error(f"Failed to parse PDF {pdf_path}: {str(e)}")
+            logger.error(f"Failed to parse PDF {filename or pdf_path}: {str(e)}")
             raise
 
-    def _extract_text_blocks_from_page(self, page: fitz.Page, page_num: int) -> List[TextBlock]:
-        """Extracts text directly from the PDF's text layer."""
-        text_blocks = []
+    def iter_page_batches(self, pdf_path: PDFSource, document: Document,
+                          pages: Optional[range] = None,
+                          max_pages: Optional[int] = None) -> Iterator[SpanTable]:
+        """
+        Streaming parse: yield the text blocks of one page at a time.
+
+        Nothing is stored on document.text_blocks. The document statistics are
+        updated after every page, so consumers always see the running values;
+        they are final once the iterator is exhausted. The heading floor is
+        sampled from a few pages up front (see _estimate_heading_floor) and
+        stored on document.candidate_floor; with HEADINGS_ONLY, only spans at
+        or above it are yielded. pages and max_pages select pages as for
+        parse(). Nothing is yielded when the document's bookmarks are used
+        instead.
+        """
+        logger.debug(f"Starting to stream PDF: {document.filename}")
+        metrics = document.metrics
+        stats = DocumentStatsAccumulator()
+        with open_pdf(pdf_path) as pdf_doc:
+            with metrics.stage("parse"):
+                selected = _select_pages(pdf_doc, pages, max_pages)
+                if self._read_bookmarks(pdf_doc, document, selected):
+                    return
+                document.page_dimensions = [(0.0, 0.0)] * document.page_count
+                document.candidate_floor = self._estimate_heading_floor(pdf_doc, selected)
+                min_size = document.candidate_floor if self.settings.HEADINGS_ONLY else None
+                page_items = self._iter_pages(pdf_doc, selected.start, selected.stop, metrics,
+                                              min_size, stats, document.deadline,
+                                              document.page_dimensions)
+
+            span_count = 0
+            while True:
+                # Time only the parser's work, not the consumer's between yields
+                with metrics.stage("parse"):
+                    item = next(page_items, None)
+                    if item is not None:
+                        span_count += len(item[1])
+                        stats.apply(document)
+                if item is None:
+                    break
+                yield item[1]
+
+        self._finish_store(metrics)
+        pages_parsed = self._mark_partial(document, len(selected))
+        metrics.count("pages", pages_parsed)
+        metrics.count("spans", span_count)
+        logger.info(f"Streamed {span_count} text blocks from {pages_parsed} of "
+                    f"{document.page_count} pages")
+
+    def _read_bookmarks(self, pdf_doc: fitz.Document, document: Document, pages: range) -> bool:
+        """Store the document's bookmarks within pages if it has a usable bookmark tree."""
+        document.page_count = len(pdf_doc)
+        if self.settings.FORCE_HEURISTICS:
+            return False
+        bookmarks = read_bookmarks(pdf_doc, pages, self.settings.MIN_BOOKMARKS)
+        if bookmarks is None:
+            return False
+        document.bookmarks = bookmarks
+        document.metrics.count("bookmarks", len(bookmarks))
+        logger.info(f"Using {len(bookmarks)} bookmarks of {document.filename}; "
+                    "skipping text extraction")
+        return True
+
+    def _mark_partial(self, document: Document, page_count: int) -> int:
+        """
+        Set document.partial_reason if the deadline cut parsing or OCR short.
+        Returns the number of pages that were parsed.
+        """
+        counters = document.metrics.counters
+        pages_parsed = page_count - counters.get("pages_skipped", 0)
+        ocr_skipped = counters.get("ocr_skipped", 0)
+        if pages_parsed < page_count or ocr_skipped:
+            reason = (f"time budget of {self.settings.DOCUMENT_TIME_BUDGET:g}s exceeded: "
+                      f"parsed {pages_parsed} of {page_count} pages")
+            if ocr_skipped:
+                reason += f", skipped OCR of {ocr_skipped} pages"
+            document.partial_reason = reason
+            document.metrics.count("partial")
+            logger.warning(f"{document.filename}: {reason}")
+        return pages_parsed
+
+    def _extract_headings_only(self, pdf_path: PDFSource, pdf_doc: fitz.Document,
+                               document: Document, pages: range) -> None:
+        """
+        Heading-only parse: keep just the spans that can become heading
+        candidates and compute the document statistics from counters.
+
+        The candidate filter needs spans at least as large as the average font
+        size, which is only known after the whole document has been read. Only
+        spans larger than the body text size sampled from a few pages are kept,
+        since headings usually pull the average above the body size (see
+        _estimate_heading_floor for documents where they do not); in the rare
+        case that the true average ends up below the floor, the document is
+        extracted again with the exact floor so that no candidate is lost.
+        """
+        metrics = document.metrics
+        min_size = self._estimate_heading_floor(pdf_doc, pages)
+        deadline = document.deadline
+        while True:
+            stats = DocumentStatsAccumulator()
+            if self._use_page_workers(len(pages), pdf_path):
+                text_blocks = self._extract_pages_parallel(pdf_path, pages, metrics, min_size,
+                                                           stats, deadline,
+                                                           document.page_dimensions)
+            else:
+                text_blocks = self._extract_page_range(pdf_doc, pages.start, pages.stop, metrics,
+                                                       min_size, stats, deadline,
+                                                       document.page_dimensions)
+            if stats.avg_font_size >= min_size or deadline.expired():
+                break
+            logger.debug(f"Average font size {stats.avg_font_size:.2f} is below the sampled floor "
+                         f"{min_size:.2f}; extracting again")
+            min_size = stats.avg_font_size
+
+        document.text_blocks = text_blocks
+        stats.apply(document)
+        metrics.count("spans_skipped", stats.skipped_spans)
+        logger.debug(f"Document stats - Avg font size: {document.avg_font_size:.1f}, Primary font: {document.primary_font}")
+
+    def _estimate_heading_floor(self, pdf_doc: fitz.Document, pages: range) -> float:
+        """
+        Estimate the smallest font size a heading candidate can have from a
+        sample of the pages: just above the sampled body text size, unless
+        the sampled average font size is lower still.
+        """
+        sample_pages = max(1, self.settings.HEADINGS_ONLY_SAMPLE_PAGES)
+        step = max(1, len(pages) // sample_pages)
+        sample = DocumentStatsAccumulator()
+        for page_num in pages[::step][:sample_pages]:
+            for block in pdf_doc[page_num].get_text("dict").get("blocks", []):
+                for line in block.get("lines", []):
+                    for span in line.get("spans", []):
+                        text = span.get("text", "").strip()
+                        if text:
+                            sample.add_span(span.get("size", 12.0), span.get("font", "Unknown"),
+                                            len(text))
+        # Where small print pulls the average below the body size, body text is a candidate
+        # anyway; the floor then follows the sampled average, with a margin for the error of
+        # the estimate
+        floor = min(float(np.nextafter(sample.body_font_size, np.inf)),
+                    sample.avg_font_size * (1.0 - _HEADING_FLOOR_MARGIN))
+        logger.debug(f"Sampled {sample.span_count} spans; keeping spans of at least {floor:.2f}pt")
+        return floor
+
+    def _use_page_workers(self, page_count: int, pdf_path: PDFSource) -> bool:
+        """Decide whether a document is large enough to split across page workers."""
+        if self.settings.PAGE_WORKERS <= 1 or page_count < self.settings.MIN_PAGES_FOR_PAGE_WORKERS:
+            return False
+        if not isinstance(pdf_path, (str, Path)):
+            # Page workers reopen the file; in-memory input would have to be copied to each of them
+            logger.debug("PDF is held in memory; parsing pages in-process")
+            return False
+        if _in_pool_worker:
+            # The documents themselves are already spread over a pool of processes
+            logger.debug("Running inside a document pool worker; parsing pages in-process")
+            return False
+        if multiprocessing.current_process().daemon:
+            # Daemonic processes (e.g. multiprocessing.Pool workers) cannot start child processes
+            logger.debug("Running inside a daemonic process; parsing pages in-process")
+            return False
+        return True
+
+    def _extract_pages_parallel(self, pdf_path: Path, pages: range, metrics: DocumentMetrics,
+                                min_size: Optional[float] = None,
+                                stats: Optional[DocumentStatsAccumulator] = None,
+                                deadline: Optional[Deadline] = None,
+                                dimensions: Optional[List[Tuple[float, float]]] = None
+                                ) -> SpanTable:
+        """
+        Split the page range into chunks, extract them in worker processes and
+        merge the results back in page order. min_size and stats are as for
+        _extract_text_blocks_from_page; the workers' statistics are merged into stats
+        and the page sizes they report into dimensions. Every worker stops at the deadline.
+        """
+        chunk_size = max(1, self.settings.PAGE_CHUNK_SIZE)
+        chunks = [(start, min(start + chunk_size, pages.stop)) for start in pages[::chunk_size]]
+        workers = min(self.settings.PAGE_WORKERS, len(chunks))
+        logger.debug(f"Parsing {len(pages)} pages in {len(chunks)} chunks "
+                     f"with {workers} page workers")
+
+        chunk_tables = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map() yields chunk results in submission order, i.e. page order
+            chunk_results = executor.map(
+                _extract_page_chunk,
+                [(str(pdf_path), self.settings, chunk, min_size, deadline) for chunk in chunks]
+            )
+            for (start, stop), chunk_result in zip(chunks, chunk_results):
+                chunk_blocks, chunk_metrics, chunk_stats, chunk_dimensions = chunk_result
+                chunk_tables.append(chunk_blocks)
+                metrics.merge(chunk_metrics)
+                if stats is not None:
+                    stats.merge(chunk_stats)
+                if dimensions is not None:
+                    dimensions[start:stop] = chunk_dimensions
+        return SpanTable.concat(chunk_tables)
+
+    def _extract_page_range(self, pdf_doc: fitz.Document, start: int, stop: int,
+                            metrics: DocumentMetrics,
+                            min_size: Optional[float] = None,
+                            stats: Optional[DocumentStatsAccumulator] = None,
+                            deadline: Optional[Deadline] = None,
+                            dimensions: Optional[List[Tuple[float, float]]] = None) -> SpanTable:
+        """Extract text blocks from pages [start, stop) into a single span table."""
+        pages = self._iter_pages(pdf_doc, start, stop, metrics, min_size, stats, deadline,
+                                 dimensions)
+        page_tables = [text_blocks for _, text_blocks in pages]
+        return SpanTable.concat(page_tables)
+
+    def _iter_pages(self, pdf_doc: fitz.Document, start: int, stop: int, metrics: DocumentMetrics,
+                    min_size: Optional[float] = None,
+                    stats: Optional[DocumentStatsAccumulator] = None,
+                    deadline: Optional[Deadline] = None,
+                    dimensions: Optional[List[Tuple[float, float]]] = None
+                    ) -> Iterator[Tuple[int, SpanTable]]:
+        """
+        Yield (page_number, text_blocks) for pages [start, stop) in page order,
+        falling back to OCR for scanned pages. min_size and stats are passed on
+        to _extract_text_blocks_from_page, and the size of each page is stored
+        in dimensions (indexed by page) while the page is loaded.
+
+        Pages are loaded once and dropped before their blocks are yielded.
+        Every STORE_SHRINK_INTERVAL pages, MuPDF's object store is trimmed.
+
+        Once the deadline has passed, no further page is started (counted as
+        pages_skipped) and pages still waiting for OCR keep just their text
+        layer (counted as ocr_skipped).
+
+        With OCR_WORKERS > 1 or OCR_BATCH_SIZE > 1, scanned pages are rendered
+        here and recognized on a thread pool, in batches of OCR_BATCH_SIZE pages,
+        while later pages are being extracted. At most
+        2 * OCR_WORKERS * OCR_BATCH_SIZE pages are held back waiting for their
+        OCR result.
+        """
+        deadline = deadline or Deadline()
+        ocr_workers = max(1, self.settings.OCR_WORKERS)
+        batch_size = max(1, self.settings.OCR_BATCH_SIZE)
+        if ocr_workers == 1 and batch_size == 1:
+            for page_num in range(start, stop):
+                if deadline.expired():
+                    metrics.count("pages_skipped", stop - page_num)
+                    return
+                page = self._load_page(pdf_doc, page_num, dimensions)
+                page_number, text_blocks, kind = self._extract_page(page, page_num, min_size, stats)
+                if kind != page_triage.TEXT:
+                    key, ocr_blocks = self._lookup_ocr(page, page_number, metrics)
+                    if ocr_blocks is None:
+                        ocr_blocks = self._ocr_page(page, page_number, key, metrics, deadline)
+                    text_blocks = self._merge_ocr_blocks(text_blocks, ocr_blocks)
+                del page  # Not kept alive while the consumer works on the yielded blocks
+                self._trim_store(metrics, page_num - start + 1)
+                yield page_number, text_blocks
+            return
+
+        pending = deque()  # _PendingPage entries, in page order
+        max_in_flight = 2 * ocr_workers * batch_size
+        pool = ThreadPoolExecutor(max_workers=ocr_workers, thread_name_prefix="ocr")
+        try:
+            batcher = OCRBatcher(self.ocr, pool, batch_size)
+            for page_num in range(start, stop):
+                if deadline.expired():
+                    metrics.count("pages_skipped", stop - page_num)
+                    break
+                page = self._load_page(pdf_doc, page_num, dimensions)
+                page_number, text_blocks, kind = self._extract_page(page, page_num, min_size, stats)
+                entry = _PendingPage(page_number, text_blocks)
+                if kind != page_triage.TEXT:
+                    entry.layer_blocks = text_blocks
+                    entry.key, entry.result = self._lookup_ocr(page, page_number, metrics)
+                    if entry.result is None:
+                        self._submit_ocr(batcher, page, entry, metrics)
+                    else:
+                        entry.result = self._merge_ocr_blocks(text_blocks, entry.result)
+                pending.append(entry)
+                del page
+                self._trim_store(metrics, page_num - start + 1)
+                # Release every finished page at the head; wait if too many are in flight
+                yield from self._release_pages(pending, batcher, pdf_doc, metrics, max_in_flight,
+                                               deadline)
+
+            yield from self._release_pages(pending, batcher, pdf_doc, metrics, 0, deadline)
+        finally:
+            # Past the deadline, OCR calls that are still running are abandoned, not waited for
+            pool.shutdown(wait=not deadline.expired(), cancel_futures=True)
+
+    def _load_page(self, pdf_doc: fitz.Document, page_num: int,
+                   dimensions: Optional[List[Tuple[float, float]]]) -> fitz.Page:
+        page = pdf_doc[page_num]
+        if dimensions is not None:
+            dimensions[page_num] = (page.rect.width, page.rect.height)
+        return page
+
+    def _trim_store(self, metrics: DocumentMetrics, pages_done: int) -> None:
+        """Shrink MuPDF's object store after every STORE_SHRINK_INTERVAL pages."""
+        interval = self.settings.STORE_SHRINK_INTERVAL
+        if interval > 0 and pages_done % interval == 0:
+            _shrink_store(metrics, self.settings.STORE_SHRINK_PERCENT)
+
+    def _finish_store(self, metrics: DocumentMetrics) -> None:
+        """Trim the store between documents and record the process's peak memory."""
+        if self.settings.STORE_SHRINK_INTERVAL > 0:
+            _shrink_store(metrics, self.settings.STORE_SHRINK_PERCENT)
+        if resource is not None:
+            # ru_maxrss is in kilobytes on Linux
+            metrics.peak("max_rss_kb", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+    def _ocr_page(self, page: fitz.Page, page_number: int, key: Optional[str],
+                  metrics: DocumentMetrics, deadline: Deadline) -> List[TextBlock]:
+        """OCR a page inline, going through the configured resolution passes."""
+        for dpi, min_confidence in self.ocr.passes:
+            if deadline.expired():
+                metrics.count("ocr_skipped")
+                return []
+            pix = self._render_for_ocr(page, page_number, metrics, dpi)
+            if pix is None:
+                return []
+            with metrics.stage("ocr"):
+                text_blocks = self.ocr.recognize(pix, page_number, page.rect.width, key,
+                                                 min_confidence)
+            if text_blocks is not None:
+                metrics.count("ocr_pages")
+                return text_blocks
+            metrics.count("ocr_retries")
+        return []
+
+    def _submit_ocr(self, batcher: OCRBatcher, page: fitz.Page, entry: "_PendingPage",
+                    metrics: DocumentMetrics) -> None:
+        """
+        Render a page for its next OCR pass and queue it for recognition. If
+        rendering fails, the page keeps just its text layer, as inline OCR does.
+        """
+        dpi, min_confidence = self.ocr.passes[entry.ocr_pass]
+        pix = self._render_for_ocr(page, entry.page_number, metrics, dpi)
+        if pix is None:
+            entry.result = entry.layer_blocks
+            return
+        entry.result = batcher.submit(pix, entry.page_number, page.rect.width, entry.key,
+                                      min_confidence)
+
+    def _release_pages(self, pending: deque, batcher: OCRBatcher, pdf_doc: fitz.Document,
+                       metrics: DocumentMetrics, max_in_flight: int,
+                       deadline: Deadline) -> Iterator[Tuple[int, SpanTable]]:
+        """
+        Yield pages from the head of pending whose text is final. Waits for the
+        head's OCR result while at least max_in_flight pages are in flight, so
+        max_in_flight=0 drains the queue. Pages that come back with too low a
+        confidence are re-rendered for the next pass and resubmitted. Waiting
+        ends at the deadline, and the head then keeps just its text layer.
+        """
+        while pending:
+            self._resubmit_low_confidence(pending, batcher, pdf_doc, metrics, deadline)
+            head = pending[0]
+            if isinstance(head.result, Future):
+                if not head.result.done():
+                    in_flight = sum(isinstance(entry.result, Future) for entry in pending)
+                    if in_flight < max_in_flight:
+                        return
+                    batcher.flush()  # The head may still be waiting in a partial batch
+                    # Wait, then check for retries again
+                    if not wait([head.result], timeout=deadline.remaining()).done:
+                        metrics.count("ocr_skipped")
+                        head.result = head.layer_blocks
+                    continue
+                text_blocks, wall, cpu = head.result.result()
+                metrics.record("ocr", wall, cpu)
+                metrics.count("ocr_pages")
+                head.result = self._merge_ocr_blocks(head.layer_blocks, text_blocks)
+            pending.popleft()
+            yield head.page_number, head.result
+
+    def _resubmit_low_confidence(self, pending: deque, batcher: OCRBatcher, pdf_doc: fitz.Document,
+                                 metrics: DocumentMetrics, deadline: Deadline) -> None:
+        """
+        Send every finished page whose OCR pass was rejected to its next pass.
+        Doing this for all pending pages at once lets retries share batches.
+        Past the deadline, such pages keep just their text layer instead.
+        """
+        for entry in pending:
+            if not (isinstance(entry.result, Future) and entry.result.done()):
+                continue
+            if entry.result.exception() is not None or entry.result.result()[0] is not None:
+                continue
+            _, wall, cpu = entry.result.result()
+            metrics.record("ocr", wall, cpu)
+            if deadline.expired():
+                metrics.count("ocr_skipped")
+                entry.result = entry.layer_blocks
+                continue
+            metrics.count("ocr_retries")
+            entry.ocr_pass += 1
+            self._submit_ocr(batcher, pdf_doc[entry.page_number - 1], entry, metrics)
+
+    def _extract_page(self, page: fitz.Page, page_num: int, min_size: Optional[float] = None,
+                      stats: Optional[DocumentStatsAccumulator] = None
+                      ) -> Tuple[int, SpanTable, str]:
+        """
+        Triage a page and extract its text layer unless it is a plain scan.
+        Returns the page number, the text-layer blocks and the page kind.
+        """
+        page_number = page_num + 1
+        kind = page_triage.classify_page(page, self.settings.SCANNED_TEXT_THRESHOLD,
+                                         self.settings.SCANNED_IMAGE_COVERAGE)
+        if kind == page_triage.SCANNED:
+            logger.debug(f"Page {page_number} is a scanned image. Attempting OCR...")
+            return page_number, SpanTable.empty(), kind
+        if kind == page_triage.HYBRID:
+            logger.debug(f"Page {page_number} has little text over a scanned image. "
+                         "Adding OCR text...")
+        blocks = self._extract_text_blocks_from_page(page, page_number, min_size, stats)
+        return page_number, blocks, kind
+
+    def _merge_ocr_blocks(self, layer_blocks: SpanTable, ocr_blocks: List[TextBlock]) -> SpanTable:
+        """
+        Append OCR lines to a page's text-layer blocks, skipping lines the text
+        layer already has.
+        """
+        if not layer_blocks:
+            return SpanTable.from_blocks(ocr_blocks)
+        layer_text = " ".join(" ".join(b.text.split()).lower() for b in layer_blocks)
+        extra = [b for b in ocr_blocks if " ".join(b.text.split()).lower() not in layer_text]
+        return SpanTable.concat([layer_blocks, SpanTable.from_blocks(extra)])
+
+    def _lookup_ocr(self, page: fitz.Page, page_number: int,
+                    metrics: DocumentMetrics) -> Tuple[Optional[str], Optional[List[TextBlock]]]:
+        """Return a scanned page's OCR cache key and its cached blocks, if any."""
+        if self.ocr.cache is None:
+            return None, None
+        try:
+            with metrics.stage("ocr_cache"):
+                key = self.ocr.cache_key(page)
+                text_blocks = self.ocr.lookup(key, page_number, page.rect.width)
+        except Exception as e:
+            logger.warning(f"OCR cache lookup failed for page {page_number}: {e}")
+            return None, None
+        if text_blocks is not None:
+            metrics.count("ocr_cache_hits")
+        return key, text_blocks
+
+    def _render_for_ocr(self, page: fitz.Page, page_number: int, metrics: DocumentMetrics,
+                        dpi: Optional[int] = None):
+        """Render a scanned page for OCR; returns None if rendering fails."""
+        try:
+            with metrics.stage("ocr_render"):
+                return self.ocr.render_page(page, dpi)
+        except Exception as e:
+            logger.error(f"OCR failed for page {page_number}: {e}")
+            return None
+
+    def _extract_text_blocks_from_page(self, page: fitz.Page, page_num: int,
+                                       min_size: Optional[float] = None,
+                                       stats: Optional[DocumentStatsAccumulator] = None
+                                       ) -> SpanTable:
+        """
+        Extracts text directly from the PDF's text layer.
+
+        Every span is counted in stats, if given. With min_size, spans
+        smaller than it are only counted and never become part of the table.
+        With COALESCE_LINES, the spans of each line are merged into line-level
+        rows (see line_coalescing.coalesce_lines).
+        """
+        text_blocks = SpanTableBuilder(FontRegistry())
+        line_ids, line_id = [], 0
         try:
             blocks = page.get_text("dict").get("blocks", [])
             for block in blocks:
                 if "lines" not in block: continue
                 for line in block["lines"]:
+                    line_id += 1
                     for span in line.get("spans", []):
-                        text = span.get("text", "").strip()
+                        raw_text = span.get("text", "")
+                        text = raw_text.strip()
                         if not text: continue
+                        if stats is not None:
+                            stats.add_span(span.get("size", 12.0), span.get("font", "Unknown"),
+                                           len(text))
+                        if min_size is not None and span.get("size", 12.0) < min_size:
+                            if stats is not None:
+                                stats.skipped_spans += 1
+                            line_id += 1  # Never join the spans on either side of a dropped one
+                            continue
                         
-                        font_info = FontInfo(
+                        bbox = span.get("bbox", (0, 0, 0, 0))
+                        
+                        text_blocks.add(
+                            text, page_num, bbox[0], bbox[1], bbox[2] - bbox[0], bbox[3] - bbox[1],
                             family=span.get("font", "Unknown"),
                             size=span.get("size", 12.0),
                             flags=span.get("flags", 0),
-                            color=self._rgb_to_hex(span.get("color", 0))
+                            color=self._rgb_to_int(span.get("color", 0)),
+                            # Line coalescing puts the stripped space between words back
+                            space_before=raw_text[0].isspace(),
+                            space_after=raw_text[-1].isspace()
                         )
-                        bbox = span.get("bbox", (0, 0, 0, 0))
-                        
-                        text_blocks.append(TextBlock(
-                            text=text, page=page_num, x=bbox[0], y=bbox[1],
-                            width=bbox[2] - bbox[0], height=bbox[3] - bbox[1],
-                            font_info=font_info
-                        ))
+                        line_ids.append(line_id)
         except Exception as e:
             logger.warning(f"Error extracting direct text from page {page_num}: {str(e)}")
-        return text_blocks
+        if self.settings.COALESCE_LINES:
+            return coalesce_lines(text_blocks.build(), np.array(line_ids, dtype=np.int64))
+        return text_blocks.build()
 
-    def _ocr_page(self, page: fitz.Page, page_num: int) -> List[TextBlock]:
-        """
-        Performs OCR on a page image to extract text from scanned documents.
-        NOTE: This loses detailed font and position info for individual words.
-        """
-        ocr_blocks = []
+    def _rgb_to_int(self, color_int: int) -> int:
+        """Clamp a span's sRGB colour to 24 bits."""
         try:
-            # Render page to an image
-            pix = page.get_pixmap(dpi=300)
-            img = Image.open(io.BytesIO(pix.tobytes()))
-            
-            # Use pytesseract to get text data
-            ocr_text = pytesseract.image_to_string(img)
-            
-            if ocr_text.strip():
-                # Since OCR doesn't give us font info, we create one large text block
-                # for the whole page with default font properties.
-                default_font = FontInfo(family="OCR", size=12.0, flags=0, color="#000000")
-                page_width, page_height = page.rect.width, page.rect.height
-                
-                # We can split the text by line to create multiple blocks
-                for line in ocr_text.splitlines():
-                    if line.strip():
-                        ocr_blocks.append(TextBlock(
-                            text=line.strip(),
-                            page=page_num,
-                            x=0, y=0, # Position is unknown from OCR
-                            width=page_width, height=12, # A-best guess for height
-                            font_info=default_font
-                        ))
-                logger.debug(f"Successfully extracted {len(ocr_blocks)} lines of text via OCR from page {page_num}")
-        except Exception as e:
-            logger.error(f"OCR failed for page {page_num}: {e}")
-        return ocr_blocks
-
-
-    def _calculate_document_stats(self, document: Document) -> None:
-        """Calculate document-wide statistics for heading detection."""
-        if not document.text_blocks: return
-        
-        font_sizes = [b.font_info.size for b in document.text_blocks if b.font_info.size > 0 and b.font_info.family != "OCR"]
-        document.avg_font_size = np.mean(font_sizes) if font_sizes else 12.0
-        
-        font_families = [b.font_info.family for b in document.text_blocks if b.font_info.family != "OCR"]
-        if font_families:
-            from collections import Counter
-            document.primary_font = Counter(font_families).most_common(1)[0][0]
-        
-        logger.debug(f"Document stats - Avg font size: {document.avg_font_size:.1f}, Primary font: {document.primary_font}")
+            return color_int & 0xFFFFFF
+        except:
+            return 0
 
 
-    def _rgb_to_hex(self, color_int: int) -> str:
-        """Convert RGB integer to hex color string."""
-        try:
-            r, g, b = (color_int >> 16) & 0xFF, (color_int >> 8) & 0xFF, color_int & 0xFF
-            return f"#{r:02x}{g:02x}{b:02x}"
-        except:
-            return "#000000"
\ No newline at end of file
+@dataclass
+class _PendingPage:
+    """A page waiting in _iter_pages for its OCR result."""
+    page_number: int
+    result: Any  # SpanTable once final, otherwise the Future of the current OCR pass
+    key: Optional[str] = None
+    ocr_pass: int = 0
+    layer_blocks: SpanTable = field(default_factory=SpanTable.empty)  # Text layer of a hybrid page
+
+
+# (pdf_path, settings, (start, stop), min_size, deadline) handed to a page worker
+_PageChunkTask = Tuple[str, Settings, Tuple[int, int], Optional[float], Optional[Deadline]]
+# (blocks, metrics, stats, page dimensions) sent back by a page worker
+_PageChunkResult = Tuple[SpanTable, DocumentMetrics, DocumentStatsAccumulator,
+                         List[Tuple[float, float]]]
+
+
+def _extract_page_chunk(task: _PageChunkTask) -> _PageChunkResult:
+    """Page worker entry point: open the PDF and extract one chunk of pages."""
+    pdf_path, settings, (start, stop), min_size, deadline = task
+    metrics = DocumentMetrics()
+    stats = DocumentStatsAccumulator()
+    parser = PDFParser(settings)
+    with metrics.stage("page_worker"), fitz.open(pdf_path) as pdf_doc:
+        dimensions = [(0.0, 0.0)] * len(pdf_doc)
+        text_blocks = parser._extract_page_range(pdf_doc, start, stop, metrics, min_size, stats,
+                                                 deadline, dimensions)
+    parser._finish_store(metrics)
+    return text_blocks, metrics, stats, dimensions[start:stop]
+
+
+def _shrink_store(metrics: DocumentMetrics, percent: int) -> None:
+    """Free percent of MuPDF's object store."""
+    fitz.TOOLS.store_shrink(percent)
+    metrics.count("store_shrinks")
@@ -208,6 +208,37 @@ def generate_content_hash(text: str) -> str:
     return hashlib.sha256(normalized_text.encode('utf-8')).hexdigest()[:16]
 
 
+def hash_file(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Generate a SHA-256 hash of a file's bytes.
+    
+    Args:
+        file_path: Path to the file
+        chunk_size: Number of bytes read at a time
+        
+    Returns:
+        Hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_bytes(data) -> str:
+    """
+    Generate a SHA-256 hash of an in-memory PDF.
+    
+    Args:
+        data: bytes or any buffer (memoryview, mmap) holding the content
+        
+    Returns:
+        Hex digest of the content, equal to hash_file of the same bytes
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
 def validate_pdf_file(file_path: Path) -> bool:
     """
     Validate that a file is a readable PDF.
@@ -265,12 +296,15 @@ def format_confidence_score(confidence: float) -> str:
         return f"{percentage:.0f}% (Very Low)"
 
 
-def estimate_processing_time(page_count: int) -> float:
+def estimate_processing_time(page_count: int, scanned_ratio: float = 0.0,
+                             file_size_mb: float = 0.0) -> float:
     """
     Estimate processing time based on page count.
     
     Args:
         page_count: Number of pages in the document
+        scanned_ratio: Fraction of pages expected to need OCR (0-1)
+        file_size_mb: Size of the PDF file in megabytes
         
     Returns:
         Estimated processing time in seconds
@@ -278,13 +312,25 @@ def estimate_processing_time(page_count: int) -> float:
     # Base time per page (empirically determined)
     base_time_per_page = 0.15  # seconds
     
+    # OCR renders and recognizes the whole page image
+    ocr_time_per_page = 3.0  # seconds
+    
+    # Large files carry embedded images and fonts that must be decoded
+    time_per_mb = 0.05  # seconds
+    
     # Additional overhead
     base_overhead = 1.0  # seconds
     
     # Scale factor for complex documents
     complexity_factor = 1.2
     
-    estimated_time = (page_count * base_time_per_page * complexity_factor) + base_overhead
+    scanned_pages = page_count * scanned_ratio
+    text_pages = page_count - scanned_pages
+    estimated_time = (
+        (text_pages * base_time_per_page + scanned_pages * ocr_time_per_page) * complexity_factor
+        + file_size_mb * time_per_mb
+        + base_overhead
+    )
     
     return max(estimated_time, 1.0)  # Minimum 1 second
 
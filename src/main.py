@@ -4,15 +4,15 @@ Main entry point for the PDF Outline Extractor application.
 
 import logging
 import argparse
+import time
 from pathlib import Path
 import os
-import json
 
 # Corrected import path for the new Settings structure
 from config.settings import Settings
-from extractor import PDFParser, HeadingDetector, OutlineBuilder
-from models.document import Document
-from models.outline import Outline
+from pipeline import (run_batch, serve, BatchManifest, MANIFEST_FILENAME, create_sink,
+                      RunSummary, MetricsWriter, record_stage)
+from pipeline.cache import extraction_fingerprint
 
 # --- Setup Project and Logging ---
 os.makedirs("logs", exist_ok=True)
@@ -25,9 +25,19 @@ logging.getLogger("pdfminer").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
 
-def process_pdfs(input_dir: Path, output_dir: Path, settings: Settings):
+def process_pdfs(input_dir: Path, output_dir: Path, settings: Settings, workers: int = 1,
+                 resume: bool = True, retry_failed: bool = False):
     """
     Process all PDF files in the input directory.
+
+    With workers > 1 the documents are fanned out to a process pool and each
+    outline is handed to the configured output sink as soon as its document
+    completes. Writing and flushing the sink is timed as each document's
+    "sink" stage, which includes an equal share of its batch's flush, so
+    metrics are recorded once a batch has been flushed. Progress is recorded
+    in a manifest in the output directory; with resume, files that already
+    completed (or failed) with the same settings are skipped, and with
+    retry_failed the previously failed files are processed again as well.
     """
     pdf_files = list(input_dir.glob("*.pdf"))
     if not pdf_files:
@@ -35,38 +45,102 @@ def process_pdfs(input_dir: Path, output_dir: Path, settings: Settings):
         return
         
     logger.info(f"Found {len(pdf_files)} PDF files to process.")
+
+    # Switching the output sink must not count earlier outputs as done
+    manifest = BatchManifest(output_dir / MANIFEST_FILENAME,
+                             f"{extraction_fingerprint(settings)}:{settings.OUTPUT_SINK}")
+    if resume or retry_failed:
+        pdf_files = manifest.select_pending(pdf_files, retry_failed=retry_failed)
+        logger.info(f"{len(pdf_files)} PDF files left to process.")
     
-    # Initialize components with the loaded settings
-    pdf_parser = PDFParser(settings)
-    heading_detector = HeadingDetector(settings)
-    outline_builder = OutlineBuilder(settings)
-    
-    for pdf_path in pdf_files:
-        try:
-            logger.info(f"Processing file: {pdf_path.name}")
-            
-            document = pdf_parser.parse(pdf_path)
-            headings = heading_detector.detect_headings(document)
-            outline = outline_builder.build_outline(headings)
-            
-            output_data = {
-                "title": document.filename,
-                "outline": [{"level": f"H{h.level}", "text": h.text, "page": h.page} for h in outline.headings]
-            }
-            
-            output_path = output_dir / f"{pdf_path.stem}_outline.json"
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=4)
-
-            logger.info(f"Successfully generated outline for {pdf_path.name}")
-
-        except Exception as e:
-            logger.error(f"Failed to process {pdf_path.name}: {e}", exc_info=True)
+    failed = 0
+    sink_options = ({"resume_window": settings.SINK_BATCH_SIZE}
+                    if settings.OUTPUT_SINK == "jsonl" else {})
+    sink = create_sink(settings.OUTPUT_SINK, output_dir, **sink_options)
+    summary = RunSummary()
+    metrics_writer = MetricsWriter(output_dir) if settings.WRITE_METRICS else None
+    # Results since the last flush, and those of them handed to the sink
+    unflushed, written = [], []
+
+    def flush(close: bool = False) -> None:
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if close:
+            sink.close()
+        else:
+            sink.flush()
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        for result in written:
+            record_stage(result, "sink", wall / len(written), cpu / len(written))
+        for result in unflushed:
+            summary.add(result)
+            if metrics_writer is not None:
+                metrics_writer.write(result)
+        unflushed.clear()
+        written.clear()
+
+    try:
+        for result in run_batch(pdf_files, settings, workers=workers):
+            if not result.success:
+                failed += 1
+                manifest.record(result, commit=False)
+            else:
+                try:
+                    wall_start, cpu_start = time.perf_counter(), time.process_time()
+                    sink.write(result.pdf_path, result.output_data)
+                    record_stage(result, "sink", time.perf_counter() - wall_start,
+                                 time.process_time() - cpu_start)
+                    written.append(result)
+                    manifest.record(result, commit=False)
+                    logger.info(f"Successfully generated outline for {result.pdf_path.name}")
+
+                except Exception as e:
+                    failed += 1
+                    manifest.record(result, error=f"{type(e).__name__}: {e}", commit=False)
+                    logger.error(f"Failed to write outline for {result.pdf_path.name}: {e}",
+                                 exc_info=True)
+
+            # Only mark documents as done in the manifest once their output is durable
+            unflushed.append(result)
+            if len(unflushed) >= settings.SINK_BATCH_SIZE:
+                flush()
+                manifest.commit()
+    finally:
+        flush(close=True)
+        manifest.commit()
+        manifest.close()
+        if metrics_writer is not None:
+            metrics_writer.close(summary)
+        summary.log()
+
+    if failed:
+        logger.warning(f"{failed} of {len(pdf_files)} PDF files failed.")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="PDF Outline Extractor")
     parser.add_argument("--verbose", action="store_true", help="Enable detailed debug logging")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes (default: WORKERS from config.json)")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Directory of the result cache "
+                             "(default: RESULT_CACHE_DIR from config.json)")
+    parser.add_argument("--sink", choices=["json", "jsonl", "sqlite"], default=None,
+                        help="Output format (default: OUTPUT_SINK from config.json)")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Write per-document metrics.jsonl and run_summary.json "
+                             "to the output directory")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Reprocess every file instead of resuming from the output manifest")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Also reprocess files that failed in a previous run")
+    parser.add_argument("--force-heuristics", action="store_true",
+                        help="Detect headings from the text even when the PDF has bookmarks")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run as a long-lived extraction server instead of processing input/")
+    parser.add_argument("--host", default="127.0.0.1", help="Server bind address (with --serve)")
+    parser.add_argument("--port", type=int, default=8080, help="Server TCP port (with --serve)")
+    parser.add_argument("--socket", default=None,
+                        help="Serve on this Unix domain socket instead of TCP")
     args = parser.parse_args()
 
     if args.verbose:
@@ -74,13 +148,28 @@ if __name__ == "__main__":
 
     # Use the new method to load settings from config.json
     app_settings = Settings.load()
+    if args.cache_dir is not None:
+        app_settings.RESULT_CACHE_DIR = args.cache_dir
+    if args.sink is not None:
+        app_settings.OUTPUT_SINK = args.sink
+    if args.metrics:
+        app_settings.WRITE_METRICS = True
+    if args.force_heuristics:
+        app_settings.FORCE_HEURISTICS = True
     logger.info(f"Loaded settings: {app_settings}")
 
-    base_dir = Path(__file__).resolve().parent.parent
-    input_directory = base_dir / "input"
-    output_directory = base_dir / "output"
-    output_directory.mkdir(exist_ok=True)
+    workers = args.workers if args.workers is not None else app_settings.WORKERS
+
+    if args.serve:
+        serve(app_settings, workers=workers, host=args.host, port=args.port,
+              socket_path=args.socket)
+    else:
+        base_dir = Path(__file__).resolve().parent.parent
+        input_directory = base_dir / "input"
+        output_directory = base_dir / "output"
+        output_directory.mkdir(exist_ok=True)
 
-    logger.info("Starting PDF Outline Extractor")
-    process_pdfs(input_directory, output_directory, app_settings)
-    logger.info("Processing complete.")
\ No newline at end of file
+        logger.info("Starting PDF Outline Extractor")
+        process_pdfs(input_directory, output_directory, app_settings, workers=workers,
+                     resume=not args.no_resume, retry_failed=args.retry_failed)
+        logger.info("Processing complete.")
\ No newline at end of file
@@ -4,5 +4,10 @@ Data models for PDF Outline Extractor.
 
 from .document import Document, TextBlock, FontInfo
 from .outline import Outline, Heading
+from .metrics import DocumentMetrics, StageTiming
+from .deadline import Deadline
+from .font_registry import FontRegistry
+from .span_table import SpanTable, SpanTableBuilder, SpanRow
 
-__all__ = ["Document", "TextBlock", "FontInfo", "Outline", "Heading"]
\ No newline at end of file
+__all__ = ["Document", "TextBlock", "FontInfo", "Outline", "Heading", "DocumentMetrics",
+           "StageTiming", "Deadline", "FontRegistry", "SpanTable", "SpanTableBuilder", "SpanRow"]
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""
+Per-document time budget shared by the parse, OCR and detection stages.
+"""
+
+import time
+from typing import Optional
+
+
+class Deadline:
+    """
+    The point in time after which no further pages or OCR calls are started
+    for a document. A deadline created without seconds never expires.
+
+    Pickling transfers the remaining time rather than the clock value, so a
+    deadline handed to a page worker process ends at the same moment.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds
+        self._end = None if seconds is None else time.monotonic() + seconds
+
+    @classmethod
+    def from_budget(cls, budget: float) -> "Deadline":
+        """Deadline for a budget in seconds, where 0 (or less) means no limit."""
+        return cls(budget if budget > 0 else None)
+
+    def expired(self) -> bool:
+        return self._end is not None and time.monotonic() >= self._end
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (0.0 once expired), or None without a limit."""
+        return None if self._end is None else max(0.0, self._end - time.monotonic())
+
+    def __reduce__(self):
+        return (Deadline, (self.remaining(),))
@@ -3,9 +3,12 @@ Data models for representing a parsed PDF document and its components.
 """
 
 from dataclasses import dataclass, field
-from typing import List, Tuple
+from typing import List, Optional, Sequence, Tuple
 from datetime import datetime
 
+from .deadline import Deadline
+from .metrics import DocumentMetrics
+
 @dataclass
 class FontInfo:
     """Stores information about the font used in a text block."""
@@ -32,12 +35,21 @@ class Document:
     filepath: str
     page_count: int = 0
     processed_at: datetime = field(default_factory=datetime.now)
-    text_blocks: List[TextBlock] = field(default_factory=list)
+    text_blocks: Sequence[TextBlock] = field(default_factory=list)  # A SpanTable once parsed
     language: str = "english" # NEW: Language of the document
 
     # Statistics for analysis
     avg_font_size: float = 0.0
     median_font_size: float = 0.0
     font_size_std: float = 0.0
+    body_font_size: float = 0.0  # Most common font size by characters
+    candidate_floor: float = 0.0  # Streaming: sampled size below which no span can be a candidate
     primary_font: str = "Unknown"
-    page_dimensions: List[Tuple[float, float]] = field(default_factory=list)
\ No newline at end of file
+    page_dimensions: List[Tuple[float, float]] = field(default_factory=list)
+    # (level, title, page) when the PDF's outline is used
+    bookmarks: Optional[List[Tuple[int, str, int]]] = None
+
+    # Stage timings and counters recorded while processing this document
+    metrics: DocumentMetrics = field(default_factory=DocumentMetrics)
+    deadline: Deadline = field(default_factory=Deadline)
+    partial_reason: Optional[str] = None  # Why only part of the document was processed, if it was
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""
+Interned font table shared by the spans of a document.
+
+A document typically uses a handful of distinct font/size/flags/colour
+combinations. Each combination is stored once as a FontInfo and spans refer
+to it by a small integer id, so font objects and colour strings are created
+once per font rather than once per span, and per-font computations can be
+cached by id.
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .document import FontInfo
+
+
+class FontRegistry:
+    """
+    Maps (family, size, flags, colour) combinations to interned FontInfo
+    instances with dense integer ids, in order of first appearance.
+    """
+
+    def __init__(self):
+        self._fonts: List[FontInfo] = []
+        self._index: Dict[Tuple[str, float, int, int], int] = {}
+
+    def intern(self, family: str, size: float, flags: int, color: int) -> int:
+        """
+        Return the id of a font combination, registering it on first use;
+        color is an RGB integer.
+        """
+        key = (family, size, flags, color)
+        font_id = self._index.get(key)
+        if font_id is None:
+            font_id = self._index[key] = len(self._fonts)
+            self._fonts.append(FontInfo(family=family, size=size, flags=flags,
+                                        color=f"#{color:06x}"))
+        return font_id
+
+    def intern_font(self, font: FontInfo) -> int:
+        """Return the id of an existing FontInfo's combination."""
+        return self.intern(font.family, font.size, font.flags, _hex_to_rgb(font.color))
+
+    def family_ids(self, family: str) -> List[int]:
+        """Ids of every registered font of the given family."""
+        return [font_id for font_id, font in enumerate(self._fonts) if font.family == family]
+
+    def __getitem__(self, font_id: int) -> FontInfo:
+        return self._fonts[font_id]
+
+    def __len__(self) -> int:
+        return len(self._fonts)
+
+    def __iter__(self) -> Iterator[FontInfo]:
+        return iter(self._fonts)
+
+
+def _hex_to_rgb(color: Optional[str]) -> int:
+    try:
+        return int(color.lstrip("#"), 16)
+    except (AttributeError, ValueError):
+        return 0
@@ -0,0 +1,90 @@
+"""
+Instrumentation models for per-document stage timings and counters.
+"""
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterator
+
+
+@dataclass
+class StageTiming:
+    """Accumulated wall-clock and CPU time of one pipeline stage."""
+    wall: float = 0.0  # Seconds
+    cpu: float = 0.0  # Seconds of CPU time in this process
+    calls: int = 0
+    max_wall: float = 0.0  # Slowest single call, e.g. the slowest OCR page
+
+    def add(self, wall: float, cpu: float) -> None:
+        """Add one measured call."""
+        self.wall += wall
+        self.cpu += cpu
+        self.calls += 1
+        self.max_wall = max(self.max_wall, wall)
+
+    def merge(self, other: 'StageTiming') -> None:
+        """Add the calls accumulated in another StageTiming."""
+        self.wall += other.wall
+        self.cpu += other.cpu
+        self.calls += other.calls
+        self.max_wall = max(self.max_wall, other.max_wall)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'wall': round(self.wall, 6),
+            'cpu': round(self.cpu, 6),
+            'calls': self.calls,
+            'max_wall': round(self.max_wall, 6)
+        }
+
+
+@dataclass
+class DocumentMetrics:
+    """
+    Stage timings and counters collected while processing one document.
+
+    Stages may nest (OCR runs inside parse), so stage times are inclusive and
+    do not sum to the document's total time.
+    """
+    stages: Dict[str, StageTiming] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    peaks: Dict[str, int] = field(default_factory=dict)  # Largest value seen, e.g. memory use
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block and add it to the named stage."""
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - wall_start, time.process_time() - cpu_start)
+
+    def record(self, name: str, wall: float, cpu: float) -> None:
+        """Add a call that was timed elsewhere, e.g. on a pool thread."""
+        self.stages.setdefault(name, StageTiming()).add(wall, cpu)
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Increment a counter."""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def peak(self, name: str, value: int) -> None:
+        """Raise a peak value to value if it is larger."""
+        self.peaks[name] = max(self.peaks.get(name, value), value)
+
+    def merge(self, other: 'DocumentMetrics') -> None:
+        """Fold metrics collected elsewhere (e.g. in a page worker) into this one."""
+        for name, timing in other.stages.items():
+            self.stages.setdefault(name, StageTiming()).merge(timing)
+        for name, value in other.counters.items():
+            self.count(name, value)
+        for name, value in other.peaks.items():
+            self.peak(name, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert metrics to a JSON-serializable dictionary."""
+        return {
+            'stages': {name: timing.to_dict() for name, timing in self.stages.items()},
+            'counters': dict(self.counters),
+            'peaks': dict(self.peaks)
+        }
@@ -0,0 +1,285 @@
+"""
+Columnar storage for the text spans of a document.
+
+A SpanTable keeps one NumPy array per span attribute instead of one TextBlock
+and FontInfo object per span, and stores the text of all spans in a single
+string addressed by an offsets array. Iterating or indexing the table yields
+SpanRow views that offer the same attributes as TextBlock, so code written
+against TextBlock keeps working, while hot paths can filter on the columns
+directly.
+"""
+
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .document import TextBlock, FontInfo
+from .font_registry import FontRegistry, _hex_to_rgb
+
+_FLOAT_COLUMNS = ("x", "y", "width", "height", "size")
+_INT_COLUMNS = ("page", "flags", "font_id", "color")
+_BOOL_COLUMNS = ("space_before", "space_after")
+
+
+class SpanRow:
+    """
+    Read-only view of one span of a SpanTable with TextBlock-style attributes.
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "SpanTable", index: int):
+        self._table = table
+        self._index = index
+
+    @property
+    def text(self) -> str:
+        offsets = self._table.column_list("text_offsets")
+        return self._table.text_buffer[offsets[self._index]:offsets[self._index + 1]]
+
+    @property
+    def page(self) -> int:
+        return self._table.column_list("page")[self._index]
+
+    @property
+    def x(self) -> float:
+        return self._table.column_list("x")[self._index]
+
+    @property
+    def y(self) -> float:
+        return self._table.column_list("y")[self._index]
+
+    @property
+    def width(self) -> float:
+        return self._table.column_list("width")[self._index]
+
+    @property
+    def height(self) -> float:
+        return self._table.column_list("height")[self._index]
+
+    @property
+    def font_id(self) -> int:
+        return self._table.column_list("font_id")[self._index]
+
+    @property
+    def font_info(self) -> FontInfo:
+        return self._table.fonts[self._table.column_list("font_id")[self._index]]
+
+    def to_text_block(self) -> TextBlock:
+        """Copy the span into a standalone TextBlock."""
+        return TextBlock(text=self.text, page=self.page, x=self.x, y=self.y,
+                         width=self.width, height=self.height, font_info=self.font_info)
+
+    def __repr__(self) -> str:
+        return f"SpanRow({self.text!r}, page={self.page})"
+
+
+class SpanTable:
+    """
+    Column arrays for a sequence of text spans, in reading order.
+
+    Columns: page (int32), x, y, width, height, size (float64), flags (int32),
+    font_id (int32, an id in the fonts registry), color (uint32 RGB) and
+    space_before/space_after (bool, whether the span's text had whitespace
+    at its start/end before it was stripped). The text of span i is
+    text_buffer[text_offsets[i]:text_offsets[i + 1]].
+    """
+
+    def __init__(self, page: np.ndarray, x: np.ndarray, y: np.ndarray, width: np.ndarray,
+                 height: np.ndarray, size: np.ndarray, flags: np.ndarray, font_id: np.ndarray,
+                 color: np.ndarray, space_before: np.ndarray, space_after: np.ndarray,
+                 text_offsets: np.ndarray, text_buffer: str, fonts: FontRegistry):
+        self.page = page
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.size = size
+        self.flags = flags
+        self.font_id = font_id
+        self.color = color
+        self.space_before = space_before
+        self.space_after = space_after
+        self.text_offsets = text_offsets
+        self.text_buffer = text_buffer
+        self.fonts = fonts
+        self._lists = {}
+
+    def column_list(self, name: str) -> list:
+        """
+        A column as a list of Python scalars, converted once on first use.
+        Row views read from these, which is much faster than indexing arrays,
+        but the lists take several times the memory of the arrays: create row
+        views on a select()ed table where only some rows are needed, and
+        release_lists() once the rows are no longer read.
+        """
+        values = self._lists.get(name)
+        if values is None:
+            values = self._lists[name] = getattr(self, name).tolist()
+        return values
+
+    def release_lists(self) -> None:
+        """Drop the cached column lists; row views still work and convert again on use."""
+        self._lists = {}
+
+    @classmethod
+    def empty(cls) -> "SpanTable":
+        return SpanTableBuilder().build()
+
+    @classmethod
+    def from_blocks(cls, blocks: Iterable[TextBlock],
+                    fonts: Optional[FontRegistry] = None) -> "SpanTable":
+        """Build a table from TextBlock objects (or rows of another table)."""
+        builder = SpanTableBuilder(fonts)
+        for block in blocks:
+            builder.add_block(block)
+        return builder.build()
+
+    @classmethod
+    def concat(cls, tables: Sequence["SpanTable"]) -> "SpanTable":
+        """
+        Concatenate tables in order. Tables with different font registries
+        are remapped onto a new one, which keeps the order in which the fonts
+        first appear.
+        """
+        tables = [t for t in tables if len(t)]
+        if not tables:
+            return cls.empty()
+        if len(tables) == 1:
+            return tables[0]
+
+        fonts = tables[0].fonts
+        if all(t.fonts is fonts for t in tables):
+            font_ids = [t.font_id for t in tables]
+        else:
+            fonts, font_ids = FontRegistry(), []
+            for table in tables:
+                remap = np.array([fonts.intern_font(font) for font in table.fonts], dtype=np.int32)
+                font_ids.append(remap[table.font_id])
+
+        starts = np.cumsum([0] + [len(t.text_buffer) for t in tables[:-1]])
+        text_offsets = np.concatenate(
+            [t.text_offsets[:-1] + start for t, start in zip(tables, starts)]
+            + [np.array([starts[-1] + len(tables[-1].text_buffer)], dtype=np.int64)]
+        )
+        columns = {name: np.concatenate([getattr(t, name) for t in tables])
+                   for name in _FLOAT_COLUMNS + ("page", "flags", "color") + _BOOL_COLUMNS}
+        return cls(font_id=np.concatenate(font_ids), text_offsets=text_offsets,
+                   text_buffer="".join(t.text_buffer for t in tables), fonts=fonts, **columns)
+
+    def family_mask(self, family: str) -> np.ndarray:
+        """Boolean mask of the spans set in the given font family."""
+        return np.isin(self.font_id, self.fonts.family_ids(family))
+
+    def take(self, indices: Sequence[int]) -> List[SpanRow]:
+        """Row views for the given span indices."""
+        return [SpanRow(self, int(i)) for i in indices]
+
+    def select(self, mask: np.ndarray) -> "SpanTable":
+        """A new table of the spans where the boolean mask is set, sharing the font registry."""
+        indices = np.flatnonzero(mask)
+        starts, ends = self.text_offsets[indices], self.text_offsets[indices + 1]
+        text_offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(ends - starts, out=text_offsets[1:])
+        columns = {name: getattr(self, name)[indices]
+                   for name in _FLOAT_COLUMNS + _INT_COLUMNS + _BOOL_COLUMNS}
+        text_buffer = "".join(self.text_buffer[a:b] for a, b in zip(starts.tolist(), ends.tolist()))
+        return SpanTable(text_offsets=text_offsets, text_buffer=text_buffer, fonts=self.fonts,
+                         **columns)
+
+    def __getstate__(self):
+        # The list caches can be rebuilt and would more than double the pickled size
+        state = self.__dict__.copy()
+        state["_lists"] = {}
+        return state
+
+    def __len__(self) -> int:
+        return len(self.page)
+
+    def __iter__(self) -> Iterator[SpanRow]:
+        for i in range(len(self)):
+            yield SpanRow(self, i)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[SpanRow, List[SpanRow]]:
+        if isinstance(index, slice):
+            return self.take(range(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("span index out of range")
+        return SpanRow(self, index)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the columns and the text buffer."""
+        arrays = (self.page, self.x, self.y, self.width, self.height, self.size,
+                  self.flags, self.font_id, self.color, self.space_before, self.space_after,
+                  self.text_offsets)
+        return sum(a.nbytes for a in arrays) + len(self.text_buffer)
+
+
+class SpanTableBuilder:
+    """
+    Accumulates spans one at a time and produces a SpanTable.
+    """
+
+    def __init__(self, fonts: Optional[FontRegistry] = None):
+        self._columns = {name: [] for name in _FLOAT_COLUMNS + _INT_COLUMNS + _BOOL_COLUMNS}
+        self._texts: List[str] = []
+        self.fonts = fonts if fonts is not None else FontRegistry()
+
+    def add(self, text: str, page: int, x: float, y: float, width: float, height: float,
+            family: str, size: float, flags: int, color: int,
+            space_before: bool = False, space_after: bool = False) -> None:
+        """
+        Append one span; color is an RGB integer. space_before/space_after
+        record whitespace stripped from the start/end of text.
+        """
+        font_id = self.fonts.intern(family, size, flags, color)
+        columns = self._columns
+        columns["page"].append(page)
+        columns["x"].append(x)
+        columns["y"].append(y)
+        columns["width"].append(width)
+        columns["height"].append(height)
+        columns["size"].append(size)
+        columns["flags"].append(flags)
+        columns["font_id"].append(font_id)
+        columns["color"].append(color)
+        columns["space_before"].append(space_before)
+        columns["space_after"].append(space_after)
+        self._texts.append(text)
+
+    def add_block(self, block: TextBlock) -> None:
+        """Append a TextBlock, e.g. an OCR line."""
+        font = block.font_info
+        self.add(block.text, block.page, block.x, block.y, block.width, block.height,
+                 font.family, font.size, font.flags, _hex_to_rgb(font.color))
+
+    def build(self) -> SpanTable:
+        columns = self._columns
+        lengths = np.fromiter((len(t) for t in self._texts), dtype=np.int64, count=len(self._texts))
+        text_offsets = np.zeros(len(self._texts) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=text_offsets[1:])
+        return SpanTable(
+            page=np.array(columns["page"], dtype=np.int32),
+            x=np.array(columns["x"], dtype=np.float64),
+            y=np.array(columns["y"], dtype=np.float64),
+            width=np.array(columns["width"], dtype=np.float64),
+            height=np.array(columns["height"], dtype=np.float64),
+            size=np.array(columns["size"], dtype=np.float64),
+            flags=np.array(columns["flags"], dtype=np.int32),
+            font_id=np.array(columns["font_id"], dtype=np.int32),
+            color=np.array(columns["color"], dtype=np.uint32),
+            space_before=np.array(columns["space_before"], dtype=bool),
+            space_after=np.array(columns["space_after"], dtype=bool),
+            text_offsets=text_offsets,
+            text_buffer="".join(self._texts),
+            fonts=self.fonts,
+        )
+
+    def __len__(self) -> int:
+        return len(self._texts)
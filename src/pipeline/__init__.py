@@ -0,0 +1,18 @@
+"""
+Batch execution components.
+
+This package wires the extractor components into a reusable per-document
+pipeline and drives it over many documents, optionally in parallel.
+"""
+
+from .worker import ExtractionPipeline, build_output_data
+from .batch import DocumentResult, run_batch
+from .server import ExtractionService, serve
+from .manifest import BatchManifest, MANIFEST_FILENAME
+from .sinks import OutputSink, create_sink
+from .metrics import RunSummary, MetricsWriter, record_stage
+
+__all__ = ["ExtractionPipeline", "build_output_data", "DocumentResult", "run_batch",
+           "ExtractionService", "serve",
+           "BatchManifest", "MANIFEST_FILENAME", "OutputSink", "create_sink",
+           "RunSummary", "MetricsWriter", "record_stage"]
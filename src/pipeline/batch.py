@@ -0,0 +1,225 @@
+"""
+Batch Runner - Fan documents out to a process pool and stream results back.
+
+Each worker process builds its own ExtractionPipeline once at startup and
+reuses it for every document it receives. Failures are captured per document
+so that one broken PDF never aborts the rest of the batch; if a worker process
+dies outright, the documents in flight are reported as failed and the pool is
+restarted for the rest.
+"""
+
+import itertools
+import logging
+import mmap
+import multiprocessing
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Iterator, List, Optional, Dict, Any
+
+from config.settings import Settings
+from extractor.pdf_parser import buffer_streams_supported, mark_pool_worker
+from extractor.utils import hash_bytes, hash_file
+from .worker import ExtractionPipeline
+from .scheduler import estimate_document_cost, order_by_cost
+
+logger = logging.getLogger(__name__)
+
+# Per-process pipeline, created by _init_worker in each pool worker
+_worker_pipeline: Optional[ExtractionPipeline] = None
+
+
+@dataclass
+class DocumentResult:
+    """Outcome of processing a single PDF."""
+    pdf_path: Path
+    output_data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    content_hash: Optional[str] = None
+    started_at: float = 0.0  # Unix timestamp
+    duration: float = 0.0  # Seconds
+    metrics: Optional[Dict[str, Any]] = None  # DocumentMetrics.to_dict()
+    lost: bool = False  # The worker process died while the document was in flight
+
+    @property
+    def partial(self) -> bool:
+        """Check if the deadline cut the document's outline short."""
+        return bool(self.output_data and self.output_data.get("partial"))
+
+    @property
+    def success(self) -> bool:
+        """Check if the document was processed successfully."""
+        return self.error is None
+
+
+def _init_worker(settings: Settings) -> None:
+    """Pool initializer: build the extractor components once per worker."""
+    global _worker_pipeline
+    _worker_pipeline = ExtractionPipeline(settings)
+
+
+def _init_pool_worker(settings: Settings) -> None:
+    """
+    Pool initializer for child processes; Ctrl-C is left to the parent to
+    handle, and documents are not split further across page workers.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Workers may be forked after the server installed its SIGTERM handler;
+    # terminate() must just end them
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    mark_pool_worker()
+    _init_worker(settings)
+
+
+def _process_document(pdf_path: Path, preview: bool = False) -> DocumentResult:
+    """Run the worker's pipeline (or its preview) on one document, isolating any failure."""
+    def run(result: DocumentResult) -> None:
+        size = pdf_path.stat().st_size
+        mmap_min = _worker_pipeline.settings.MMAP_MIN_MB * 1024 * 1024
+        if not 0 < mmap_min <= size or not buffer_streams_supported():
+            # Without buffer support a mapped file would be copied whole;
+            # MuPDF reads the path lazily
+            result.content_hash = hash_file(pdf_path)
+            _run_pipeline(result, pdf_path, pdf_path.name, preview)
+            return
+        # Parse large files straight from the page cache instead of reading them into memory
+        with open(pdf_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                result.content_hash = hash_bytes(view)
+                _run_pipeline(result, view, pdf_path.name, preview)
+
+    return _process(DocumentResult(pdf_path=pdf_path), pdf_path.name, run)
+
+
+def _process_bytes(data: bytes, filename: str, preview: bool = False) -> DocumentResult:
+    """
+    Run the worker's pipeline (or its preview) on a PDF received in memory,
+    isolating any failure.
+    """
+    # Keep the caller's file name: it becomes the outline title
+    name = Path(filename).name
+
+    def run(result: DocumentResult) -> None:
+        result.content_hash = hash_bytes(data)
+        _run_pipeline(result, data, name, preview)
+
+    return _process(DocumentResult(pdf_path=Path(name)), name, run)
+
+
+def _process(result: DocumentResult, name: str, run) -> DocumentResult:
+    result.started_at = time.time()
+    start = time.perf_counter()
+    try:
+        logger.info(f"Processing file: {name}")
+        run(result)
+    except Exception as e:
+        logger.error(f"Failed to process {name}: {e}", exc_info=True)
+        result.error = f"{type(e).__name__}: {e}"
+    result.duration = time.perf_counter() - start
+    return result
+
+
+def _run_pipeline(result: DocumentResult, source, filename: str, preview: bool = False) -> None:
+    if preview:
+        result.output_data, metrics = _worker_pipeline.preview(source, filename=filename)
+    else:
+        result.output_data, metrics = _worker_pipeline.run(source, content_hash=result.content_hash,
+                                                           filename=filename)
+    result.metrics = metrics.to_dict()
+
+
+def run_batch(pdf_files: List[Path], settings: Settings,
+              workers: int = 1) -> Iterator[DocumentResult]:
+    """
+    Process PDF files and yield a result for each one as soon as it completes.
+
+    With a process pool and SCHEDULE_BY_COST, files are pre-scanned and
+    dispatched in order of descending predicted cost to minimise makespan.
+
+    Args:
+        pdf_files: PDF files to process
+        settings: Settings used to build the extractor components
+        workers: Number of worker processes; 1 runs in the calling process
+
+    Yields:
+        DocumentResult for every input file, in completion order
+    """
+    workers = max(1, min(workers, len(pdf_files)))
+
+    if workers == 1:
+        _init_worker(settings)
+        for pdf_path in pdf_files:
+            yield _process_document(pdf_path)
+        return
+
+    logger.info(f"Starting process pool with {workers} workers")
+    pool = _new_pool(workers, settings)
+    in_flight: Dict[Future, Path] = {}
+    try:
+        if settings.SCHEDULE_BY_COST:
+            # Pre-scan on the pool too, so a large batch isn't bottlenecked on one core
+            estimate = partial(estimate_document_cost, sample_pages=settings.SCHEDULE_SAMPLE_PAGES,
+                               text_threshold=settings.SCANNED_TEXT_THRESHOLD,
+                               image_coverage=settings.SCANNED_IMAGE_COVERAGE)
+            try:
+                costs = list(pool.map(estimate, pdf_files, chunksize=16))
+                pdf_files = order_by_cost(pdf_files, costs)
+            except BrokenProcessPool:
+                logger.warning("A worker died while pre-scanning; "
+                               "processing files in the given order")
+                pool.shutdown(wait=False)
+                pool = _new_pool(workers, settings)
+
+        # Files are handed out lazily, one per idle worker, and returned as they finish
+        pending = iter(pdf_files)
+        while True:
+            for pdf_path in itertools.islice(pending, workers - len(in_flight)):
+                in_flight[pool.submit(_process_document, pdf_path)] = pdf_path
+            if not in_flight:
+                return
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                pdf_path = in_flight.pop(future)
+                try:
+                    yield future.result()
+                except BrokenProcessPool:
+                    # A worker died (crash, OOM kill); every document in flight is lost
+                    # with the pool
+                    broken = True
+                    yield _lost_result(pdf_path)
+            if broken:
+                for future in wait(in_flight).done:
+                    yield _result_or_lost(future, in_flight.pop(future))
+                logger.warning("A worker process died; restarting the process pool")
+                pool.shutdown(wait=False)
+                pool = _new_pool(workers, settings)
+    finally:
+        pool.shutdown(wait=not in_flight, cancel_futures=True)
+        if in_flight:
+            # Interrupted: don't wait for the documents still being processed
+            for process in multiprocessing.active_children():
+                process.terminate()
+
+
+def _new_pool(workers: int, settings: Settings) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(workers, initializer=_init_pool_worker, initargs=(settings,))
+
+
+def _result_or_lost(future: Future, pdf_path: Path) -> DocumentResult:
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        return _lost_result(pdf_path)
+
+
+def _lost_result(pdf_path: Path) -> DocumentResult:
+    """Failure result for a document whose worker process died while it was in flight."""
+    logger.error(f"Failed to process {pdf_path.name}: worker process died")
+    return DocumentResult(pdf_path=pdf_path, lost=True,
+                          error="BrokenProcessPool: worker process died while processing "
+                                "this or another document in flight")
@@ -0,0 +1,77 @@
+"""
+Result Cache - Skip documents whose bytes and effective settings are unchanged.
+
+Outline records are cached under a key derived from the SHA-256 of the PDF
+bytes, the settings that influence extraction and the extractor version.
+"""
+
+import json
+import hashlib
+import logging
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from config.settings import Settings
+from extractor import __version__ as EXTRACTOR_VERSION
+from extractor.disk_cache import DiskCache
+from extractor.utils import hash_bytes, hash_file
+
+logger = logging.getLogger(__name__)
+
+# Settings that only change how work is scheduled, never the extracted outline
+_RUNTIME_SETTINGS = {
+    "WORKERS", "PAGE_WORKERS", "MMAP_MIN_MB", "DOCUMENT_TIME_BUDGET",
+    "STORE_SHRINK_INTERVAL", "STORE_SHRINK_PERCENT", "PAGE_CHUNK_SIZE",
+    "MIN_PAGES_FOR_PAGE_WORKERS", "SCHEDULE_BY_COST", "SCHEDULE_SAMPLE_PAGES", "OUTPUT_SINK",
+    "SINK_BATCH_SIZE", "WRITE_METRICS", "PREVIEW_PAGES", "OCR_WORKERS", "OCR_BATCH_SIZE",
+    "OCR_CACHE_DIR", "OCR_CACHE_MAX_MB",
+    "RESULT_CACHE_DIR", "RESULT_CACHE_MAX_MB",
+}
+
+
+def settings_fingerprint(settings: Settings) -> str:
+    """Hash the settings that can affect the extracted outline."""
+    effective = {k: v for k, v in asdict(settings).items() if k not in _RUNTIME_SETTINGS}
+    payload = json.dumps(effective, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def extraction_fingerprint(settings: Settings) -> str:
+    """Identify the extractor version and effective settings an outline was produced with."""
+    return f"{EXTRACTOR_VERSION}:{settings_fingerprint(settings)}"
+
+
+class ResultCache:
+    """
+    Persistent cache of outline records keyed by PDF content.
+    """
+
+    def __init__(self, settings: Settings):
+        self._store = DiskCache(Path(settings.RESULT_CACHE_DIR),
+                                settings.RESULT_CACHE_MAX_MB * 1024 * 1024)
+        self._fingerprint = extraction_fingerprint(settings)
+
+    def key_for(self, pdf_path, content_hash: Optional[str] = None) -> str:
+        """Compute the cache key for a PDF file, or for PDF bytes held in memory."""
+        if not content_hash:
+            if isinstance(pdf_path, (str, Path)):
+                content_hash = hash_file(pdf_path)
+            else:
+                content_hash = hash_bytes(pdf_path)
+        return hashlib.sha256(f"{content_hash}:{self._fingerprint}".encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached outline record for key, if present."""
+        data = self._store.get(key)
+        if data is None:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            logger.warning(f"Ignoring corrupt result cache entry {key}")
+            return None
+
+    def put(self, key: str, output_data: Dict[str, Any]) -> None:
+        """Store an outline record."""
+        self._store.put(key, json.dumps(output_data).encode('utf-8'))
@@ -0,0 +1,155 @@
+"""
+Batch Manifest - Record per-file progress so interrupted batch runs can resume.
+
+The manifest is a small SQLite database kept in the output directory. Every
+finished document is recorded together with its size, mtime, content hash,
+timings and error, and committed as soon as its output is durable, so a run
+that is killed part-way through only redoes the documents that were in flight.
+Documents whose worker process died, and outlines the time budget cut short,
+are recorded too but are redone by the next run like new files.
+"""
+
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from .batch import DocumentResult
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.sqlite"
+
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_PARTIAL = "partial"  # Outline cut short by DOCUMENT_TIME_BUDGET
+STATUS_LOST = "lost"  # The worker process died while the document was in flight
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT,
+    settings_fingerprint TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    started_at REAL,
+    duration REAL,
+    error TEXT,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class BatchManifest:
+    """
+    Per-file status journal for process_pdfs.
+    """
+
+    def __init__(self, db_path: Path, settings_fingerprint: str):
+        self.db_path = Path(db_path)
+        self.settings_fingerprint = settings_fingerprint
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def select_pending(self, pdf_files: List[Path], retry_failed: bool = False) -> List[Path]:
+        """
+        Filter pdf_files down to the files that still need processing.
+
+        A file counts as unchanged when its size, mtime and the settings
+        fingerprint match the recorded row. Unchanged files that completed are
+        skipped; unchanged files that failed are only selected with
+        retry_failed, in addition to the other pending files. Partial and
+        lost documents are always selected again.
+        """
+        rows = {
+            path: (size, mtime_ns, fingerprint, status)
+            for path, size, mtime_ns, fingerprint, status in self._conn.execute(
+                "SELECT path, size, mtime_ns, settings_fingerprint, status FROM files"
+            )
+        }
+
+        pending, skipped_done, skipped_failed = [], 0, 0
+        for pdf_path in pdf_files:
+            stat = pdf_path.stat()
+            row = rows.get(str(pdf_path))
+            unchanged = row is not None and row[:3] == (stat.st_size, stat.st_mtime_ns,
+                                                        self.settings_fingerprint)
+            status = row[3] if unchanged else None
+
+            if status == STATUS_DONE:
+                skipped_done += 1
+            elif status == STATUS_FAILED and not retry_failed:
+                skipped_failed += 1
+            else:
+                pending.append(pdf_path)
+
+        if skipped_done or skipped_failed:
+            logger.info(f"Resuming from manifest: skipping {skipped_done} completed and "
+                        f"{skipped_failed} failed files")
+        return pending
+
+    def record(self, result: DocumentResult, error: Optional[str] = None,
+               commit: bool = True) -> None:
+        """
+        Record the outcome of one document.
+
+        Args:
+            result: Result returned by the batch runner
+            error: Overrides result.error, e.g. when writing the output failed;
+                a lost document stays lost, to be redone by the next run
+            commit: Commit immediately; pass False when the output is buffered
+                and call commit() once it has been flushed
+        """
+        error = error or result.error
+        try:
+            stat = result.pdf_path.stat()
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+        except OSError:
+            size, mtime_ns = -1, -1  # File vanished; never matches on resume
+        self._conn.execute(
+            """
+            INSERT INTO files (path, size, mtime_ns, content_hash, settings_fingerprint, status,
+                               attempts, started_at, duration, error, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?, ?, ?)
+            ON CONFLICT(path) DO UPDATE SET
+                size = excluded.size,
+                mtime_ns = excluded.mtime_ns,
+                content_hash = excluded.content_hash,
+                settings_fingerprint = excluded.settings_fingerprint,
+                status = excluded.status,
+                attempts = files.attempts + 1,
+                started_at = excluded.started_at,
+                duration = excluded.duration,
+                error = excluded.error,
+                updated_at = excluded.updated_at
+            """,
+            (
+                str(result.pdf_path), size, mtime_ns, result.content_hash,
+                self.settings_fingerprint, _status(result, error),
+                result.started_at, result.duration, error, time.time(),
+            ),
+        )
+        if commit:
+            self.commit()
+
+    def commit(self) -> None:
+        """Commit all recorded outcomes."""
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+
+def _status(result: DocumentResult, error: Optional[str]) -> str:
+    if result.lost:
+        return STATUS_LOST
+    if error:
+        return STATUS_FAILED
+    return STATUS_PARTIAL if result.partial else STATUS_DONE
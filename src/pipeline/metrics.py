@@ -0,0 +1,107 @@
+"""
+Run Metrics - Per-document instrumentation records and an aggregated run summary.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Any
+
+from models.metrics import DocumentMetrics, StageTiming
+from .batch import DocumentResult
+
+logger = logging.getLogger(__name__)
+
+METRICS_FILENAME = "metrics.jsonl"
+SUMMARY_FILENAME = "run_summary.json"
+
+
+def document_record(result: DocumentResult) -> Dict[str, Any]:
+    """Build the machine-readable metrics record for one processed document."""
+    return {
+        "file": result.pdf_path.name,
+        "success": result.success,
+        "error": result.error,
+        "duration": round(result.duration, 6),
+        **(result.metrics or {"stages": {}, "counters": {}, "peaks": {}}),
+    }
+
+
+def record_stage(result: DocumentResult, name: str, wall: float, cpu: float) -> None:
+    """
+    Add a call timed in the parent process, e.g. writing the outline to the
+    sink, to a result's metrics.
+    """
+    if result.metrics is None:
+        result.metrics = DocumentMetrics().to_dict()
+    timing = StageTiming(**result.metrics["stages"].get(name, {}))
+    timing.add(wall, cpu)
+    result.metrics["stages"][name] = timing.to_dict()
+
+
+class RunSummary:
+    """
+    Aggregates stage timings and counters over all documents of a run.
+    """
+
+    def __init__(self):
+        self.documents = 0
+        self.failed = 0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.stages: Dict[str, StageTiming] = {}
+        self.counters: Dict[str, int] = {}
+        self.peaks: Dict[str, int] = {}  # Largest value over all documents
+
+    def add(self, result: DocumentResult) -> None:
+        """Fold one document's result into the summary."""
+        self.documents += 1
+        self.failed += 0 if result.success else 1
+        self.total_duration += result.duration
+        self.max_duration = max(self.max_duration, result.duration)
+        if not result.metrics:
+            return
+        for name, timing in result.metrics["stages"].items():
+            self.stages.setdefault(name, StageTiming()).merge(StageTiming(**timing))
+        for name, value in result.metrics["counters"].items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        for name, value in result.metrics.get("peaks", {}).items():
+            self.peaks[name] = max(self.peaks.get(name, value), value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the summary to a JSON-serializable dictionary."""
+        return {
+            "documents": self.documents,
+            "failed": self.failed,
+            "total_duration": round(self.total_duration, 6),
+            "max_duration": round(self.max_duration, 6),
+            "stages": {name: timing.to_dict() for name, timing in sorted(self.stages.items())},
+            "counters": dict(sorted(self.counters.items())),
+            "peaks": dict(sorted(self.peaks.items())),
+        }
+
+    def log(self) -> None:
+        """Log a one-line overview of where the time went."""
+        busiest = sorted(self.stages.items(), key=lambda item: item[1].wall, reverse=True)[:4]
+        stages = ", ".join(f"{name} {timing.wall:.1f}s" for name, timing in busiest)
+        logger.info(f"Run summary: {self.documents} documents ({self.failed} failed) in "
+                    f"{self.total_duration:.1f}s of worker time; {stages}")
+
+
+class MetricsWriter:
+    """
+    Writes per-document records to metrics.jsonl and the run summary to
+    run_summary.json in the output directory.
+    """
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = output_dir
+        self._file = open(output_dir / METRICS_FILENAME, 'a', encoding='utf-8')
+
+    def write(self, result: DocumentResult) -> None:
+        self._file.write(json.dumps(document_record(result)) + "\n")
+
+    def close(self, summary: RunSummary) -> None:
+        self._file.close()
+        with open(self.output_dir / SUMMARY_FILENAME, 'w', encoding='utf-8') as f:
+            json.dump(summary.to_dict(), f, indent=4)
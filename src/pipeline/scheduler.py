@@ -0,0 +1,59 @@
+"""
+Cost-Aware Scheduling - Order batch work by predicted processing cost.
+
+A cheap pre-scan opens each PDF, reads its page count and samples a few
+pages for a text layer. Dispatching the most expensive documents first keeps
+a large scanned document from starting last and holding up the whole batch.
+"""
+
+import logging
+from pathlib import Path
+from typing import List
+
+import fitz  # PyMuPDF
+
+from extractor import page_triage
+from extractor.utils import estimate_processing_time
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_document_cost(pdf_path: Path, sample_pages: int = 3, text_threshold: int = 50,
+                           image_coverage: float = 0.5) -> float:
+    """
+    Predict how long a PDF will take to process.
+
+    Args:
+        pdf_path: Path to the PDF file
+        sample_pages: Number of evenly spaced pages inspected for a text layer
+        text_threshold, image_coverage: Page triage thresholds, see page_triage.classify_page
+
+    Returns:
+        Estimated processing time in seconds; 0.0 if the file cannot be opened,
+        since such documents fail quickly
+    """
+    try:
+        file_size_mb = pdf_path.stat().st_size / (1024 * 1024)
+        with fitz.open(pdf_path) as pdf_doc:
+            page_count = len(pdf_doc)
+            if page_count == 0:
+                return 0.0
+            step = max(1, page_count // max(1, sample_pages))
+            sampled = range(0, page_count, step)[:sample_pages]
+            kinds = [page_triage.classify_page(pdf_doc[page_num], text_threshold, image_coverage)
+                     for page_num in sampled]
+            scanned = sum(1 for kind in kinds if kind != page_triage.TEXT)
+        return estimate_processing_time(page_count, scanned_ratio=scanned / len(sampled),
+                                        file_size_mb=file_size_mb)
+    except Exception as e:
+        logger.debug(f"Cost pre-scan failed for {pdf_path.name}: {e}")
+        return 0.0
+
+
+def order_by_cost(pdf_files: List[Path], costs: List[float]) -> List[Path]:
+    """Return pdf_files sorted by descending predicted cost."""
+    ordered = sorted(zip(costs, pdf_files), key=lambda item: item[0], reverse=True)
+    if ordered:
+        logger.info(f"Scheduling {len(ordered)} files longest first "
+                    f"(predicted {ordered[0][0]:.1f}s down to {ordered[-1][0]:.1f}s)")
+    return [pdf_path for _, pdf_path in ordered]
@@ -0,0 +1,199 @@
+"""
+Extraction Server - Long-running local service backed by warm worker processes.
+
+The server keeps a process pool whose workers hold initialized extractor
+components, so a request only pays for the extraction itself. If a worker
+process dies, the request it was serving fails with a 500 and the pool is
+replaced. It listens on a localhost TCP port or a Unix domain socket.
+
+Endpoints:
+    GET  /health    Liveness check
+    POST /extract   Body is either the raw PDF bytes (Content-Type: application/pdf,
+                    optional ?filename=name.pdf) or JSON {"path": "/path/to/file.pdf"}.
+                    Responds with the same outline JSON that process_pdfs writes.
+    POST /preview   Same request bodies as /extract. Responds with the title and the
+                    first-level headings of the first PREVIEW_PAGES pages only.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+
+from config.settings import Settings
+from .batch import DocumentResult, _init_pool_worker, _process_bytes, _process_document
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionService:
+    """
+    Pool of warm extraction workers shared by all request handler threads.
+    """
+
+    def __init__(self, settings: Settings, workers: int = 1):
+        self.workers = max(1, workers)
+        self._settings = settings
+        self._lock = threading.Lock()
+        self._pool = self._new_pool()
+
+    def extract_path(self, pdf_path: Path, preview: bool = False) -> DocumentResult:
+        """Extract the outline (or its preview) of a PDF on the local filesystem."""
+        return self._run(_process_document, pdf_path, preview)
+
+    def extract_bytes(self, data: bytes, filename: str, preview: bool = False) -> DocumentResult:
+        """
+        Extract the outline (or its preview) of a PDF received as bytes; the
+        worker parses them in memory.
+        """
+        return self._run(_process_bytes, data, filename, preview)
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        for process in multiprocessing.active_children():
+            process.terminate()
+
+    def _run(self, fn, *args) -> DocumentResult:
+        """
+        Run fn on a worker. Raises BrokenProcessPool if the worker died (or
+        another one did while this request was queued); the pool is replaced
+        so that later requests are served again.
+        """
+        pool = self._pool
+        try:
+            return pool.submit(fn, *args).result()
+        except BrokenProcessPool:
+            with self._lock:
+                if self._pool is pool:
+                    logger.error("A worker process died; restarting the worker pool")
+                    pool.shutdown(wait=False)
+                    self._pool = self._new_pool()
+            raise
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(self.workers, initializer=_init_pool_worker,
+                                   initargs=(self._settings,))
+
+
+class ExtractionRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler translating requests into ExtractionService calls."""
+
+    service: ExtractionService = None  # Set by serve()
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self._send_json(200, {"status": "ok", "workers": self.service.workers})
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path not in ("/extract", "/preview"):
+            self._send_json(404, {"error": "Not found"})
+            return
+        preview = url.path == "/preview"
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            self._send_json(400, {"error": "Request body is empty"})
+            return
+        body = self.rfile.read(length)
+
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+        if content_type == "application/json":
+            try:
+                pdf_path = Path(json.loads(body)["path"])
+            except (ValueError, KeyError, TypeError):
+                self._send_json(400, {"error": "Expected a JSON object with a 'path' field"})
+                return
+            if not pdf_path.is_file():
+                self._send_json(404, {"error": f"File not found: {pdf_path}"})
+                return
+            extract = partial(self.service.extract_path, pdf_path, preview)
+        else:
+            filename = parse_qs(url.query).get("filename", ["document.pdf"])[0]
+            extract = partial(self.service.extract_bytes, body, filename, preview)
+
+        try:
+            result = extract()
+        except BrokenProcessPool:
+            self._send_json(500, {"error": "Worker process died while processing the document"})
+            return
+
+        if result.success:
+            self._send_json(200, result.output_data)
+        else:
+            self._send_json(422, {"error": result.error})
+
+    def _send_json(self, status: int, payload) -> None:
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} - {format % args}")
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+class UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    """Threaded HTTP server listening on a Unix domain socket."""
+    daemon_threads = True
+
+
+def serve(settings: Settings, workers: int = 1, host: str = "127.0.0.1", port: int = 8080,
+          socket_path: Optional[str] = None) -> None:
+    """
+    Run the extraction server until interrupted.
+
+    Args:
+        settings: Settings used to build the worker components
+        workers: Number of warm worker processes
+        host: Interface to bind when serving over TCP
+        port: TCP port
+        socket_path: Serve on this Unix domain socket instead of TCP
+    """
+    service = ExtractionService(settings, workers)
+    handler = type("BoundExtractionRequestHandler", (ExtractionRequestHandler,),
+                   {"service": service})
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = UnixHTTPServer(socket_path, handler)
+        logger.info(f"Serving on unix socket {socket_path} with {service.workers} workers")
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        logger.info(f"Serving on http://{host}:{port} with {service.workers} workers")
+
+    # Shut down cleanly when the service manager stops us
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down server")
+    finally:
+        server.server_close()
+        service.close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
@@ -0,0 +1,194 @@
+"""
+Output Sinks - Destinations for the outline records produced by a batch run.
+
+    json    One pretty-printed <stem>_outline.json file per PDF (the default)
+    jsonl   A single append-only outlines.jsonl stream, one record per line
+    sqlite  An outlines.sqlite database with a documents and a headings table
+
+The bulk sinks buffer records and only write/commit them on flush(), which
+process_pdfs calls every SINK_BATCH_SIZE documents.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class OutputSink:
+    """
+    Base class for outline record destinations.
+    """
+
+    def write(self, pdf_path: Path, output_data: Dict[str, Any]) -> None:
+        """Add the outline record of one PDF."""
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Make all records written so far durable."""
+
+    def close(self) -> None:
+        """Flush and release the sink."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class JsonFileSink(OutputSink):
+    """Writes one pretty-printed JSON file per document."""
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = output_dir
+
+    def write(self, pdf_path: Path, output_data: Dict[str, Any]) -> None:
+        output_path = self.output_dir / f"{pdf_path.stem}_outline.json"
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(output_data, f, indent=4)
+
+
+class JsonLinesSink(OutputSink):
+    """
+    Appends compact records to a single JSON Lines file.
+
+    A run that dies after a flush but before the manifest commit leaves
+    records in the stream that the resumed run processes again. Such a redo
+    can only concern the last resume_window records (process_pdfs commits
+    the manifest after every SINK_BATCH_SIZE records), so those lines of an
+    existing stream are indexed and identical records are not appended a
+    second time. A document whose record changed (reprocessed with other
+    settings, a partial outline) is appended again; the last record of a
+    file is the current one.
+    """
+
+    FILENAME = "outlines.jsonl"
+
+    def __init__(self, output_dir: Path, resume_window: int = 100):
+        self.path = output_dir / self.FILENAME
+        recent = _tail_lines(self.path, resume_window) if self.path.exists() else []
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if recent and not recent[-1].endswith("\n"):
+            self._file.write("\n")  # Terminate a record torn by a crash instead of appending to it
+        self._recent = set(recent)
+        self._buffer: List[str] = []
+
+    def write(self, pdf_path: Path, output_data: Dict[str, Any]) -> None:
+        record = {"file": pdf_path.name, **output_data}
+        line = json.dumps(record) + "\n"
+        if line in self._recent:
+            logger.debug(f"{pdf_path.name} is already in {self.FILENAME}; not appending it again")
+            return
+        self._buffer.append(line)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._file.writelines(self._buffer)
+            self._buffer.clear()
+        self._file.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+
+class SqliteSink(OutputSink):
+    """Stores one row per document and one row per heading in SQLite."""
+
+    FILENAME = "outlines.sqlite"
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS documents (
+        id INTEGER PRIMARY KEY,
+        file TEXT NOT NULL UNIQUE,
+        title TEXT,
+        heading_count INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS headings (
+        document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        level TEXT NOT NULL,
+        text TEXT NOT NULL,
+        page INTEGER NOT NULL,
+        PRIMARY KEY (document_id, position)
+    );
+    """
+
+    def __init__(self, output_dir: Path):
+        self.path = output_dir / self.FILENAME
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(self._SCHEMA)
+        self._buffer: List[Tuple[str, Dict[str, Any]]] = []
+
+    def write(self, pdf_path: Path, output_data: Dict[str, Any]) -> None:
+        self._buffer.append((pdf_path.name, output_data))
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        with self._conn:  # One transaction per batch
+            for filename, output_data in self._buffer:
+                outline = output_data.get("outline", [])
+                # Reprocessed documents replace their previous rows
+                self._conn.execute("DELETE FROM documents WHERE file = ?", (filename,))
+                cursor = self._conn.execute(
+                    "INSERT INTO documents (file, title, heading_count) VALUES (?, ?, ?)",
+                    (filename, output_data.get("title"), len(outline)),
+                )
+                self._conn.executemany(
+                    "INSERT INTO headings (document_id, position, level, text, page) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(cursor.lastrowid, i, h["level"], h["text"], h["page"])
+                     for i, h in enumerate(outline)],
+                )
+        self._buffer.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+
+def _tail_lines(path: Path, count: int) -> List[str]:
+    """The last count lines of a text file (with their line endings), read backwards in blocks."""
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        data = b""
+        while position > 0 and data.count(b"\n") <= count:
+            step = min(1 << 16, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.decode('utf-8', errors='replace').splitlines(keepends=True)
+    return lines[-count:] if count > 0 else []
+
+
+SINKS = {
+    "json": JsonFileSink,
+    "jsonl": JsonLinesSink,
+    "sqlite": SqliteSink,
+}
+
+
+def create_sink(kind: str, output_dir: Path, **options) -> OutputSink:
+    """
+    Create an output sink by name.
+
+    Args:
+        kind: One of the keys of SINKS
+        output_dir: Directory the sink writes into
+        options: Sink-specific keyword arguments (jsonl: resume_window)
+
+    Returns:
+        Open OutputSink
+    """
+    if kind not in SINKS:
+        raise ValueError(f"Unknown output sink '{kind}', expected one of: {', '.join(SINKS)}")
+    return SINKS[kind](output_dir, **options)
@@ -0,0 +1,131 @@
+"""
+Extraction Pipeline - Run parse, detection and outline building for one document.
+
+A pipeline owns a single PDFParser/HeadingDetector/OutlineBuilder triple so
+that the components (and their compiled heuristics) are built once and then
+reused for every document handled by the same process.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+from config.settings import Settings
+from extractor import PDFParser, HeadingDetector, OutlineBuilder
+from extractor.pdf_parser import PDFSource
+from models.deadline import Deadline
+from models.document import Document
+from models.metrics import DocumentMetrics
+from models.outline import Outline
+from .cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+
+def build_output_data(document: Document, outline: Outline) -> Dict[str, Any]:
+    """Build the JSON-serializable outline record written for each document."""
+    output_data = {
+        "title": document.filename,
+        "outline": [{"level": f"H{h.level}", "text": h.text, "page": h.page}
+                    for h in outline.headings]
+    }
+    if document.partial_reason:
+        output_data["partial"] = True
+        output_data["partial_reason"] = document.partial_reason
+    return output_data
+
+
+class ExtractionPipeline:
+    """
+    Holds initialized extractor components and runs them on one document at a time.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.pdf_parser = PDFParser(settings)
+        self.heading_detector = HeadingDetector(settings)
+        self.outline_builder = OutlineBuilder(settings)
+        self.result_cache = ResultCache(settings) if settings.RESULT_CACHE_DIR else None
+
+    def extract(self, pdf_path: PDFSource, content_hash: Optional[str] = None,
+                filename: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Extract the outline of a single PDF.
+
+        Args:
+            pdf_path: Path to the PDF file, or its content as bytes, a memoryview or an mmap
+            content_hash: SHA-256 of the file, if the caller already computed it
+            filename: Name used as the title; defaults to the file name of pdf_path
+
+        Returns:
+            Output record as produced by build_output_data
+        """
+        output_data, _ = self.run(pdf_path, content_hash, filename)
+        return output_data
+
+    def run(self, pdf_path: PDFSource, content_hash: Optional[str] = None,
+            filename: Optional[str] = None) -> Tuple[Dict[str, Any], DocumentMetrics]:
+        """
+        Extract the outline of a single PDF and report how the time was spent.
+
+        Returns:
+            Tuple of (output record, metrics collected for this document)
+        """
+        metrics = DocumentMetrics()
+        # The budget also covers the cache lookup and, for streaming, heading detection
+        deadline = Deadline.from_budget(self.settings.DOCUMENT_TIME_BUDGET)
+        filename = filename or _source_name(pdf_path)
+        cache_key = None
+        if self.result_cache is not None:
+            with metrics.stage("cache_lookup"):
+                cache_key = self.result_cache.key_for(pdf_path, content_hash)
+                cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Using cached outline for {filename}")
+                metrics.count("cache_hits")
+                # The key is content-based, so the same bytes may arrive under another name
+                cached["title"] = filename
+                return cached, metrics
+
+        if self.settings.STREAMING:
+            document = Document(filename=filename, metrics=metrics, deadline=deadline,
+                                filepath=str(pdf_path) if isinstance(pdf_path, (str, Path)) else "")
+            page_batches = self.pdf_parser.iter_page_batches(pdf_path, document)
+            headings = self.heading_detector.detect_headings_streaming(document, page_batches)
+        else:
+            document = self.pdf_parser.parse(pdf_path, metrics=metrics, filename=filename,
+                                             deadline=deadline)
+            headings = self.heading_detector.detect_headings(document)
+        with metrics.stage("outline_build"):
+            outline = self.outline_builder.build_outline(headings)
+        with metrics.stage("serialization"):
+            output_data = build_output_data(document, outline)
+
+        if cache_key is not None and not document.partial_reason:
+            self.result_cache.put(cache_key, output_data)
+        return output_data, metrics
+
+    def preview(self, pdf_path: PDFSource,
+                filename: Optional[str] = None) -> Tuple[Dict[str, Any], DocumentMetrics]:
+        """
+        Extract the title and first-level headings of the first PREVIEW_PAGES pages only.
+        Previews are never cached.
+
+        Returns:
+            Tuple of (output record, metrics collected for this document)
+        """
+        metrics = DocumentMetrics()
+        document = self.pdf_parser.parse(pdf_path, metrics=metrics,
+                                         filename=filename or _source_name(pdf_path),
+                                         max_pages=self.settings.PREVIEW_PAGES)
+        headings = self.heading_detector.detect_preview(document)
+        with metrics.stage("outline_build"):
+            outline = self.outline_builder.build_outline(headings)
+        with metrics.stage("serialization"):
+            output_data = build_output_data(document, outline)
+        return output_data, metrics
+
+
+def _source_name(pdf_path: PDFSource) -> str:
+    """Default document name: the file name, or a placeholder for in-memory PDFs."""
+    return Path(pdf_path).name if isinstance(pdf_path, (str, Path)) else "document.pdf"
@@ -0,0 +1,156 @@
+"""
+Shared test setup: put src/ on the import path and generate small PDFs.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import fitz  # PyMuPDF
+import pytest
+import pytesseract
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+BODY_LINE = "Body text that is set in the regular size and runs across most of the line."
+
+
+def write_pdf(path: Path, chapters: int = 6, body_lines: int = 30, toc=None, sections: bool = False) -> Path:
+    """
+    Write a PDF with one chapter per page: a 16pt bold heading "<n>. Chapter
+    heading <n>" followed by body_lines lines of 10pt body text. The first
+    page also carries a 24pt bold title. With sections, each chapter also
+    has a 12pt bold "<n>.1 Section of chapter <n>" heading after its first
+    lines. toc is passed to set_toc if given.
+    """
+    doc = fitz.open()
+    for chapter in range(1, chapters + 1):
+        page = doc.new_page()
+        y = 72
+        if chapter == 1:
+            page.insert_text((72, y), "A Generated Test Document", fontname="hebo", fontsize=24)
+            y += 48
+        page.insert_text((72, y), f"{chapter}. Chapter heading {chapter}", fontname="hebo", fontsize=16)
+        y += 30
+        for line in range(body_lines):
+            if sections and line == 5:
+                page.insert_text((72, y), f"{chapter}.1 Section of chapter {chapter}",
+                                 fontname="hebo", fontsize=12)
+                y += 20
+            page.insert_text((72, y), BODY_LINE, fontname="helv", fontsize=10)
+            y += 14
+    if toc is not None:
+        doc.set_toc(toc)
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def page_shade(page_index: int) -> int:
+    """Gray level of the image on a page written by write_scanned_pdf."""
+    return 40 + 10 * page_index
+
+
+def write_scanned_pdf(path: Path, pages: int = 2, caption: str = "") -> Path:
+    """
+    Write a PDF whose pages are each covered by a plain grayscale image, as a
+    scanner produces; every page has its own shade (see page_shade), so
+    FakeTesseract can tell them apart. A caption, if given, is drawn as text
+    over the image.
+    """
+    doc = fitz.open()
+    for page_index in range(pages):
+        image = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 85, 110), False)
+        image.set_rect(image.irect, (page_shade(page_index),))
+        page = doc.new_page()
+        page.insert_image(page.rect, pixmap=image)
+        if caption:
+            page.insert_text((72, 72), caption, fontname="helv", fontsize=10)
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+class FakeTesseract:
+    """
+    Stand-in for the tesseract calls of pytesseract. It reads the PGM files
+    (or image list files) it is given, and "recognizes" each page as a heading
+    naming the page's shade followed by a line of body text.
+
+    Every call is recorded in calls as a list of (width, height, shade) per
+    page. confidence maps a page width to the word confidence image_to_data
+    reports, and every call takes delay seconds.
+    """
+
+    def __init__(self, confidence=lambda width: 95.0, delay: float = 0.0):
+        self.confidence = confidence
+        self.delay = delay
+        self.calls = []
+        self.max_active = 0  # Most calls running at the same time
+        self._active = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def page_text(shade: int):
+        return [f"Scanned page {shade}", "Body text recognized from the scan"]
+
+    def image_to_string(self, image, lang=None, config=""):
+        pages = self._recognize(image)
+        return "".join("\n".join(self.page_text(shade)) + "\n\f" for _, _, shade in pages)
+
+    def image_to_data(self, image, lang=None, config="", output_type=None):
+        data = {key: [] for key in ("text", "conf", "page_num", "block_num", "par_num", "line_num")}
+        for page_num, (width, _, shade) in enumerate(self._recognize(image), 1):
+            rows = [("", -1, 0)]  # Page-level layout row
+            rows += [(word, self.confidence(width), line_num)
+                     for line_num, line in enumerate(self.page_text(shade), 1)
+                     for word in line.split()]
+            for text, conf, line_num in rows:
+                data["text"].append(text)
+                data["conf"].append(conf)
+                data["page_num"].append(page_num)
+                data["block_num"].append(1)
+                data["par_num"].append(1)
+                data["line_num"].append(line_num)
+        return data
+
+    def _recognize(self, image):
+        with self._lock:
+            self._active += 1
+            self.max_active = max(self.max_active, self._active)
+        try:
+            time.sleep(self.delay)
+            if image.endswith(".txt"):
+                paths = Path(image).read_text().split()
+            else:
+                paths = [image]
+            pages = [self._read_pgm(path) for path in paths]
+            with self._lock:
+                self.calls.append(pages)
+            return pages
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    @staticmethod
+    def _read_pgm(path):
+        data = Path(path).read_bytes()
+        magic, size, maxval, samples = data.split(b"\n", 3)
+        width, height = map(int, size.split())
+        assert (magic, maxval, len(samples)) == (b"P5", b"255", width * height)
+        # Round off the resampling error at the image edges
+        return width, height, round(samples[len(samples) // 2] / 10) * 10
+
+
+@pytest.fixture
+def fake_tesseract(monkeypatch) -> FakeTesseract:
+    fake = FakeTesseract()
+    monkeypatch.setattr(pytesseract, "image_to_string", fake.image_to_string)
+    monkeypatch.setattr(pytesseract, "image_to_data", fake.image_to_data)
+    return fake
+
+
+@pytest.fixture
+def sample_pdf(tmp_path) -> Path:
+    return write_pdf(tmp_path / "generated.pdf")
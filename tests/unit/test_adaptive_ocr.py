@@ -0,0 +1,64 @@
+import pytest
+
+from conftest import FakeTesseract, page_shade, write_scanned_pdf
+from config.settings import Settings
+from extractor.ocr import OCREngine
+from extractor.pdf_parser import PDFParser
+
+ADAPTIVE = {"OCR_ADAPTIVE": True, "OCR_LOW_DPI": 72, "OCR_DPI": 144, "OCR_MIN_CONFIDENCE": 70.0}
+
+
+def low_res_is_unclear(width):
+    """Confidence of a fake tesseract that reads 72 dpi pages badly."""
+    return 50.0 if width < 1000 else 95.0
+
+
+@pytest.fixture
+def scan(tmp_path):
+    return write_scanned_pdf(tmp_path / "scan.pdf", pages=3)
+
+
+def widths(fake):
+    return [[width for width, _, _ in call] for call in fake.calls]
+
+
+def test_passes():
+    assert OCREngine(Settings()).passes == [(300, None)]
+    assert OCREngine(Settings(**ADAPTIVE)).passes == [(72, 70.0), (144, None)]
+    assert OCREngine(Settings(**{**ADAPTIVE, "OCR_LOW_DPI": 144})).passes == [(144, None)]
+
+
+@pytest.mark.parametrize("ocr_workers", [1, 2])
+def test_clear_pages_stay_at_the_low_resolution(scan, fake_tesseract, ocr_workers):
+    document = PDFParser(Settings(OCR_WORKERS=ocr_workers, **ADAPTIVE)).parse(scan)
+    assert widths(fake_tesseract) == [[595]] * 3
+    assert "ocr_retries" not in document.metrics.counters
+    assert document.metrics.counters["ocr_pages"] == 3
+
+
+@pytest.mark.parametrize("ocr_workers", [1, 2])
+def test_unclear_pages_are_rendered_again(scan, fake_tesseract, ocr_workers):
+    fake_tesseract.confidence = low_res_is_unclear
+    document = PDFParser(Settings(OCR_WORKERS=ocr_workers, **ADAPTIVE)).parse(scan)
+    assert sorted(widths(fake_tesseract)) == [[595]] * 3 + [[1190]] * 3
+    assert document.metrics.counters["ocr_retries"] == 3
+    assert document.metrics.counters["ocr_pages"] == 3
+    assert [row.text for row in document.text_blocks] == [
+        line for i in range(3) for line in FakeTesseract.page_text(page_shade(i))]
+
+
+def test_final_pass_accepts_any_confidence(scan, fake_tesseract):
+    fake_tesseract.confidence = lambda width: 10.0
+    document = PDFParser(Settings(**ADAPTIVE)).parse(scan)
+    assert len(fake_tesseract.calls) == 6
+    assert len(document.text_blocks) == 6
+
+
+def test_rejected_pass_is_not_cached(scan, tmp_path, fake_tesseract):
+    fake_tesseract.confidence = low_res_is_unclear
+    settings = Settings(OCR_CACHE_DIR=str(tmp_path / "ocr"), **ADAPTIVE)
+    PDFParser(settings).parse(scan)
+    document = PDFParser(settings).parse(scan)
+    assert len(fake_tesseract.calls) == 6
+    assert document.metrics.counters["ocr_cache_hits"] == 3
+    assert len(document.text_blocks) == 6
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from conftest import write_pdf
+from config.settings import Settings
+from pipeline import batch
+
+_process_document = batch._process_document
+
+
+def _crash_on_doc1(pdf_path, preview=False):
+    """Stand-in for batch._process_document whose worker dies on doc1.pdf."""
+    if pdf_path.name == "doc1.pdf":
+        os._exit(1)
+    return _process_document(pdf_path, preview)
+
+
+@pytest.fixture
+def pdf_files(tmp_path):
+    return [write_pdf(tmp_path / f"doc{i}.pdf", chapters=3) for i in range(4)]
+
+
+def test_sequential_and_pooled_runs_agree(pdf_files):
+    settings = Settings(SCHEDULE_BY_COST=False)
+    sequential = {r.pdf_path: r.output_data for r in batch.run_batch(pdf_files, settings, workers=1)}
+    pooled = {r.pdf_path: r.output_data for r in batch.run_batch(pdf_files, settings, workers=2)}
+    assert pooled == sequential
+    assert all(output["outline"] for output in pooled.values())
+
+
+def test_pool_workers_do_not_start_page_workers(pdf_files):
+    settings = Settings(PAGE_WORKERS=2, MIN_PAGES_FOR_PAGE_WORKERS=2, PAGE_CHUNK_SIZE=1)
+    results = list(batch.run_batch(pdf_files, settings, workers=2))
+    assert all(r.success for r in results)
+    assert not any("page_worker" in r.metrics["stages"] for r in results)
+
+
+def test_dead_worker_fails_only_the_documents_in_flight(pdf_files, monkeypatch):
+    monkeypatch.setattr(batch, "_process_document", _crash_on_doc1)
+    results = list(batch.run_batch(pdf_files, Settings(SCHEDULE_BY_COST=False), workers=2))
+
+    assert sorted(r.pdf_path.name for r in results) == [p.name for p in pdf_files]
+    failed = {r.pdf_path.name for r in results if not r.success}
+    # The crashing document fails, and at most the one that was in flight next to it
+    assert "doc1.pdf" in failed and len(failed) <= 2
+    assert all(r.lost and r.error.startswith("BrokenProcessPool") for r in results if not r.success)
+    assert {"doc2.pdf", "doc3.pdf"} <= {r.pdf_path.name for r in results if r.success}
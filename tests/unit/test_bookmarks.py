@@ -0,0 +1,50 @@
+import fitz  # PyMuPDF
+import pytest
+
+from conftest import write_pdf
+from extractor.bookmarks import read_bookmarks
+
+TOC = [[1, "Introduction", 1], [2, " Background ", 2], [3, "Method", 3], [4, "Deep detail", 3], [1, "Results", 5]]
+
+
+@pytest.fixture
+def open_pdf(tmp_path):
+    documents = []
+
+    def _open(toc, chapters=6):
+        doc = fitz.open(str(write_pdf(tmp_path / f"doc{len(documents)}.pdf", chapters=chapters, toc=toc)))
+        documents.append(doc)
+        return doc
+
+    yield _open
+    for doc in documents:
+        doc.close()
+
+
+def test_plausible_bookmarks_are_read(open_pdf):
+    doc = open_pdf(TOC)
+    assert read_bookmarks(doc, range(len(doc))) == [
+        (1, "Introduction", 1), (2, "Background", 2), (3, "Method", 3), (3, "Deep detail", 3),
+        (1, "Results", 5)]
+
+
+def test_entries_are_limited_to_the_page_range(open_pdf):
+    doc = open_pdf(TOC)
+    assert read_bookmarks(doc, range(1, 3)) == [(2, "Background", 2), (3, "Method", 3), (3, "Deep detail", 3)]
+
+
+def test_no_or_too_few_bookmarks(open_pdf):
+    assert read_bookmarks(open_pdf(None), range(6)) is None
+    doc = open_pdf(TOC[:2])
+    assert read_bookmarks(doc, range(6), min_entries=3) is None
+    assert read_bookmarks(doc, range(6), min_entries=2) is not None
+
+
+def test_bookmarks_all_on_one_page_are_ignored(open_pdf):
+    doc = open_pdf([[1, "Report", 1], [1, "Contents", 1], [1, "Summary", 1]])
+    assert read_bookmarks(doc, range(6)) is None
+
+
+def test_bookmarks_out_of_order_are_ignored(open_pdf):
+    doc = open_pdf([[1, "A", 6], [1, "B", 5], [1, "C", 4], [1, "D", 3], [1, "E", 2]])
+    assert read_bookmarks(doc, range(6)) is None
@@ -0,0 +1,75 @@
+import pickle
+import time
+
+from conftest import write_scanned_pdf
+from config.settings import Settings
+from extractor.heading_detector import HeadingDetector
+from extractor.pdf_parser import PDFParser
+from models.deadline import Deadline
+from pipeline.worker import ExtractionPipeline
+
+
+class PageCountdown(Deadline):
+    """Deadline that expires once it has been checked a given number of times."""
+
+    def __init__(self, checks: int):
+        super().__init__(60.0)
+        self.checks = checks
+
+    def expired(self) -> bool:
+        self.checks -= 1
+        return self.checks < 0
+
+
+def test_deadline_basics():
+    unlimited = Deadline.from_budget(0)
+    assert not unlimited.expired() and unlimited.remaining() is None
+    assert Deadline(0).expired() and Deadline(0).remaining() == 0.0
+    assert 59 < Deadline(60).remaining() <= 60
+
+
+def test_pickled_deadline_keeps_the_remaining_time():
+    deadline = Deadline(0.2)
+    time.sleep(0.1)
+    copy = pickle.loads(pickle.dumps(deadline))
+    assert copy.remaining() <= deadline.remaining() + 0.01
+    assert copy.remaining() < 0.15
+    assert pickle.loads(pickle.dumps(Deadline())).remaining() is None
+
+
+def test_deadline_stops_parsing_between_pages(sample_pdf):
+    document = PDFParser(Settings()).parse(sample_pdf, deadline=PageCountdown(3))
+    assert {row.page for row in document.text_blocks} == {1, 2, 3}
+    assert document.metrics.counters["pages_skipped"] == 3
+    assert document.metrics.counters["pages"] == 3
+    assert document.partial_reason.endswith("parsed 3 of 6 pages")
+    headings = HeadingDetector(Settings()).detect_headings(document)
+    assert "3. Chapter heading 3" in [h.text for h in headings]
+    assert "4. Chapter heading 4" not in [h.text for h in headings]
+
+
+def test_spent_budget_gives_a_partial_outline(sample_pdf):
+    for streaming in (False, True):
+        settings = Settings(DOCUMENT_TIME_BUDGET=1e-9, STREAMING=streaming)
+        output, metrics = ExtractionPipeline(settings).run(sample_pdf)
+        assert output["partial"] is True
+        assert "time budget of 1e-09s exceeded: parsed 0 of 6 pages" in output["partial_reason"]
+        assert output["outline"] == []
+        assert metrics.counters["partial"] == 1
+
+
+def test_complete_outline_is_not_partial(sample_pdf):
+    output, metrics = ExtractionPipeline(Settings(DOCUMENT_TIME_BUDGET=60)).run(sample_pdf)
+    assert "partial" not in output and "partial_reason" not in output
+    assert "partial" not in metrics.counters
+
+
+def test_pending_ocr_is_abandoned_at_the_deadline(tmp_path, fake_tesseract):
+    fake_tesseract.delay = 0.5
+    path = write_scanned_pdf(tmp_path / "scan.pdf", pages=4)
+    started = time.perf_counter()
+    document = PDFParser(Settings(OCR_WORKERS=2)).parse(path, deadline=Deadline(0.1))
+    assert time.perf_counter() - started < 0.45
+    assert document.metrics.counters["ocr_skipped"] >= 1
+    assert "skipped OCR of" in document.partial_reason
+    assert "ocr_pages" not in document.metrics.counters
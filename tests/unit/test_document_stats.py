@@ -0,0 +1,52 @@
+import pytest
+
+from extractor.document_stats import DocumentStatsAccumulator
+from models.document import Document
+
+
+def accumulate(spans):
+    stats = DocumentStatsAccumulator()
+    for size, family, chars in spans:
+        stats.add_span(size, family, chars)
+    return stats
+
+
+def test_statistics():
+    stats = accumulate([(10.0, "Times", 300), (10.0, "Times", 300), (16.0, "Helvetica", 20), (0.0, "Times", 5)])
+    assert stats.span_count == 4
+    assert stats.avg_font_size == pytest.approx(12.0)  # Per span, sizeless spans excluded
+    assert stats.median_font_size == 10.0
+    assert stats.body_font_size == 10.0
+    mean = (600 * 10.0 + 20 * 16.0) / 620
+    assert stats.font_size_std == pytest.approx(((600 * (10 - mean) ** 2 + 20 * (16 - mean) ** 2) / 620) ** 0.5)
+
+
+def test_defaults_without_spans():
+    stats = DocumentStatsAccumulator()
+    assert (stats.avg_font_size, stats.median_font_size, stats.font_size_std, stats.body_font_size) == \
+        (12.0, 0.0, 0.0, 0.0)
+
+
+def test_body_size_tie_takes_the_smaller_size():
+    assert accumulate([(12.0, "A", 50), (9.0, "A", 50)]).body_font_size == 9.0
+
+
+def test_merge_matches_a_single_pass():
+    spans = [(10.0, "Times", 100), (14.0, "Arial", 10), (10.0, "Arial", 60), (18.0, "Arial", 5)]
+    whole = accumulate(spans)
+    merged = accumulate(spans[:2])
+    merged.skipped_spans = 3
+    other = accumulate(spans[2:])
+    other.skipped_spans = 4
+    merged.merge(other)
+    assert merged.skipped_spans == 7
+    for name in ("span_count", "avg_font_size", "median_font_size", "font_size_std", "body_font_size"):
+        assert getattr(merged, name) == pytest.approx(getattr(whole, name))
+
+
+def test_apply_writes_the_document_fields():
+    document = Document(filename="x.pdf", filepath="x.pdf", page_count=1)
+    accumulate([(10.0, "Times", 100), (14.0, "Arial", 10), (10.0, "Arial", 20)]).apply(document)
+    assert document.body_font_size == 10.0
+    assert document.primary_font == "Times"
+    assert document.avg_font_size == pytest.approx(34.0 / 3)
@@ -0,0 +1,89 @@
+import fitz  # PyMuPDF
+import numpy as np
+
+from config.settings import Settings
+from extractor.line_coalescing import coalesce_lines, merge_heading_lines
+from extractor.pdf_parser import PDFParser
+from models.document import FontInfo, TextBlock
+from models.span_table import SpanTableBuilder
+
+BOLD = 16
+
+
+def build(spans):
+    """spans: (text, x, width, size, flags) on page 1, all at y=100."""
+    builder = SpanTableBuilder()
+    for text, x, width, size, flags in spans:
+        builder.add(text, 1, x, 100.0, width, size, family="Helvetica", size=size, flags=flags, color=0)
+    return builder.build()
+
+
+def test_spans_of_one_line_are_merged():
+    table = build([("1.", 72.0, 10.0, 16.0, BOLD), ("Intro", 85.0, 40.0, 16.0, BOLD),
+                   ("duction", 125.0, 50.0, 16.0, BOLD)])
+    merged = coalesce_lines(table, np.array([0, 0, 0]))
+    assert len(merged) == 1
+    row = merged[0]
+    # A space goes where spans are visibly apart, none where they touch
+    assert row.text == "1. Introduction"
+    assert (row.x, row.width, row.height) == (72.0, 103.0, 16.0)
+    assert row.font_info.flags == BOLD
+
+
+def test_runs_break_on_line_size_and_weight():
+    table = build([("Heading", 72.0, 60.0, 16.0, BOLD), ("body", 140.0, 30.0, 10.0, 0),
+                   ("bold", 170.0, 30.0, 10.0, BOLD), ("next", 72.0, 30.0, 10.0, BOLD),
+                   ("line", 102.0, 30.0, 10.2, BOLD)])
+    merged = coalesce_lines(table, np.array([0, 0, 0, 1, 1]))
+    assert [row.text for row in merged] == ["Heading", "body", "bold", "nextline"]
+
+
+def test_nothing_to_merge_returns_the_table():
+    table = build([("a", 0.0, 5.0, 10.0, 0), ("b", 0.0, 5.0, 10.0, 0)])
+    assert coalesce_lines(table, np.array([0, 1])) is table
+
+
+def heading(text, y, x=72.0, page=1, size=16.0):
+    font = FontInfo(family="Helvetica-Bold", size=size, flags=BOLD, color="#000000")
+    return TextBlock(text=text, page=page, x=x, y=y, width=200.0, height=size, font_info=font)
+
+
+def test_wrapped_heading_lines_are_joined():
+    merged = merge_heading_lines([heading("A long heading that", 100.0), heading("wraps", 120.0)], 200)
+    assert [(b.text, b.y, b.height) for b in merged] == [("A long heading that wraps", 100.0, 36.0)]
+
+
+def test_separate_headings_stay_apart():
+    candidates = [heading("First", 100.0), heading("Far below", 300.0),
+                  heading("Other page", 316.0, page=2), heading("Other size", 340.0, page=2, size=12.0)]
+    assert merge_heading_lines(candidates, 200) == candidates
+
+
+def test_merged_text_respects_max_length():
+    candidates = [heading("Twelve chars", 100.0), heading("more", 120.0)]
+    assert len(merge_heading_lines(candidates, 15)) == 2
+
+
+def test_stripped_whitespace_separates_touching_spans():
+    builder = SpanTableBuilder()
+    # "1. " and "Word " end in a space inside their box, so the next span touches them
+    for text, x, width, space_after in (("1.", 72.0, 14.0, True), ("Introduction", 86.0, 90.0, False),
+                                        ("Word", 176.0, 40.0, True), ("next", 216.0, 30.0, False)):
+        builder.add(text, 1, x, 100.0, width, 16.0, family="Helvetica-Bold", size=16.0, flags=BOLD,
+                    color=0, space_after=space_after)
+    merged = coalesce_lines(builder.build(), np.array([0, 0, 1, 1]))
+    assert [row.text for row in merged] == ["1. Introduction", "Word next"]
+
+
+def test_parsed_line_keeps_the_space_after_a_number(tmp_path):
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 100), "1. ", fontname="hebo", fontsize=16)
+    page.insert_text((72 + fitz.get_text_length("1. ", "hebo", 16), 100), "Introduction",
+                     fontname="tibo", fontsize=16)
+    page.insert_text((72, 140), "Word ", fontname="helv", fontsize=10)
+    page.insert_text((72 + fitz.get_text_length("Word ", "helv", 10), 140), "next", fontname="helv", fontsize=10)
+    parser = PDFParser(Settings())
+    texts = [block.text for block in parser._extract_text_blocks_from_page(doc[0], 1)]
+    doc.close()
+    assert texts == ["1. Introduction", "Word next"]
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from pipeline.batch import DocumentResult
+from pipeline.manifest import STATUS_LOST, STATUS_PARTIAL, BatchManifest
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for name in ("done.pdf", "failed.pdf", "new.pdf"):
+        path = tmp_path / name
+        path.write_bytes(b"%PDF-" + name.encode())
+        paths.append(path)
+    return paths
+
+
+def open_manifest(tmp_path, fingerprint="v1"):
+    return BatchManifest(tmp_path / "manifest.sqlite", fingerprint)
+
+
+def record(manifest, done, failed):
+    manifest.record(DocumentResult(pdf_path=done, output_data={}))
+    manifest.record(DocumentResult(pdf_path=failed, error="boom"))
+
+
+def test_completed_and_failed_files_are_skipped(tmp_path, files):
+    done, failed, new = files
+    manifest = open_manifest(tmp_path)
+    assert manifest.select_pending(files) == files
+    record(manifest, done, failed)
+    assert manifest.select_pending(files) == [new]
+    # Retrying adds the failures to the other pending files
+    assert manifest.select_pending(files, retry_failed=True) == [failed, new]
+    manifest.close()
+
+
+def test_outcomes_survive_reopening(tmp_path, files):
+    done, failed, new = files
+    manifest = open_manifest(tmp_path)
+    record(manifest, done, failed)
+    manifest.close()
+    manifest = open_manifest(tmp_path)
+    assert manifest.select_pending(files) == [new]
+    manifest.close()
+
+
+def test_changed_files_are_selected_again(tmp_path, files):
+    done, failed, new = files
+    manifest = open_manifest(tmp_path)
+    record(manifest, done, failed)
+    done.write_bytes(b"%PDF- rewritten with another size")
+    stat = failed.stat()
+    os.utime(failed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert manifest.select_pending(files) == files
+    assert manifest.select_pending(files, retry_failed=True) == files
+    manifest.close()
+
+
+def test_changed_settings_select_everything(tmp_path, files):
+    manifest = open_manifest(tmp_path)
+    record(manifest, *files[:2])
+    manifest.close()
+    manifest = open_manifest(tmp_path, fingerprint="v2")
+    assert manifest.select_pending(files) == files
+    manifest.close()
+
+
+def test_lost_and_partial_documents_are_redone(tmp_path, files):
+    lost, partial, done = files
+    manifest = open_manifest(tmp_path)
+    manifest.record(DocumentResult(pdf_path=lost, lost=True, error="BrokenProcessPool: worker died"))
+    manifest.record(DocumentResult(pdf_path=partial, output_data={"outline": [], "partial": True}))
+    manifest.record(DocumentResult(pdf_path=done, output_data={"outline": []}))
+    assert manifest.select_pending(files) == [lost, partial]
+    statuses = dict(manifest._conn.execute("SELECT path, status FROM files"))
+    assert statuses[str(lost)] == STATUS_LOST and statuses[str(partial)] == STATUS_PARTIAL
+    manifest.close()
+
+
+def test_write_errors_are_failures(tmp_path, files):
+    manifest = open_manifest(tmp_path)
+    manifest.record(DocumentResult(pdf_path=files[0], output_data={"outline": []}), error="OSError: disk full")
+    assert manifest.select_pending(files) == files[1:]
+    assert manifest.select_pending(files, retry_failed=True) == files
+    manifest.close()
@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz  # PyMuPDF
+import pytest
+
+from conftest import page_shade, write_scanned_pdf
+from config.settings import Settings
+from extractor.ocr import OCRBatcher, OCREngine
+from extractor.pdf_parser import PDFParser
+
+
+@pytest.fixture
+def scan(tmp_path):
+    return write_scanned_pdf(tmp_path / "scan.pdf", pages=7)
+
+
+def texts(document):
+    return [(row.page, row.text) for row in document.text_blocks]
+
+
+@pytest.mark.parametrize("ocr_workers", [1, 2])
+def test_pages_are_recognized_in_batches(scan, fake_tesseract, ocr_workers):
+    expected = texts(PDFParser(Settings()).parse(scan))
+    fake_tesseract.calls.clear()
+    document = PDFParser(Settings(OCR_BATCH_SIZE=3, OCR_WORKERS=ocr_workers)).parse(scan)
+    assert sorted(len(call) for call in fake_tesseract.calls) == [1, 3, 3]
+    shades = sorted(shade for call in fake_tesseract.calls for _, _, shade in call)
+    assert shades == [page_shade(i) for i in range(7)]
+    assert texts(document) == expected
+    assert document.metrics.counters["ocr_pages"] == 7
+    assert document.metrics.stages["ocr"].calls == 7
+
+
+def test_adaptive_batches_keep_confidence_floors_apart(scan, fake_tesseract):
+    fake_tesseract.confidence = lambda width: 50.0 if width < 1000 else 95.0
+    settings = Settings(OCR_BATCH_SIZE=4, OCR_ADAPTIVE=True, OCR_LOW_DPI=72, OCR_DPI=144)
+    document = PDFParser(settings).parse(scan)
+    assert all(len({width for width, _, _ in call}) == 1 for call in fake_tesseract.calls)
+    assert sum(len(call) for call in fake_tesseract.calls) == 14
+    assert document.metrics.counters["ocr_retries"] == 7
+    assert len(document.text_blocks) == 14
+
+
+def test_short_tesseract_output_fails_the_batch_only(scan, fake_tesseract, monkeypatch):
+    image_to_string = fake_tesseract.image_to_string
+    monkeypatch.setattr("pytesseract.image_to_string",
+                        lambda image, **kwargs: image_to_string(image).split("\f")[0])
+    with fitz.open(scan) as doc:
+        engine = OCREngine(Settings())
+        pages = [(engine.render_page(doc[i], 36), i + 1, 100.0, None) for i in range(3)]
+        assert engine.recognize_batch(pages) == [[], [], []]
+        assert len(engine.recognize_batch(pages[:1])[0]) == 2
+
+
+def test_batcher_flushes_when_full_and_on_demand(scan, fake_tesseract):
+    with fitz.open(scan) as doc, ThreadPoolExecutor(1) as pool:
+        engine = OCREngine(Settings())
+        batcher = OCRBatcher(engine, pool, batch_size=2)
+        futures = [batcher.submit(engine.render_page(doc[i], 36), i + 1, 100.0)
+                   for i in range(3)]
+        futures[1].result()
+        assert not futures[2].done()
+        batcher.flush()
+        results = [future.result() for future in futures]
+    assert [len(call) for call in fake_tesseract.calls] == [2, 1]
+    assert [blocks[0].page for blocks, _, _ in results] == [1, 2, 3]
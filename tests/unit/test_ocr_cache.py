@@ -0,0 +1,60 @@
+import pytest
+
+from conftest import write_scanned_pdf
+from config.settings import Settings
+from extractor.pdf_parser import PDFParser
+
+
+@pytest.fixture
+def scan(tmp_path):
+    return write_scanned_pdf(tmp_path / "scan.pdf", pages=3)
+
+
+def parse(path, cache_dir, **settings):
+    return PDFParser(Settings(OCR_CACHE_DIR=str(cache_dir), **settings)).parse(path)
+
+
+def texts(document):
+    return [(row.page, row.text) for row in document.text_blocks]
+
+
+@pytest.mark.parametrize("ocr_workers", [1, 2])
+def test_second_run_is_served_from_the_cache(scan, tmp_path, fake_tesseract, ocr_workers):
+    first = parse(scan, tmp_path / "ocr", OCR_WORKERS=ocr_workers)
+    assert len(fake_tesseract.calls) == 3
+    second = parse(scan, tmp_path / "ocr", OCR_WORKERS=ocr_workers)
+    assert len(fake_tesseract.calls) == 3
+    assert second.metrics.counters["ocr_cache_hits"] == 3
+    assert texts(second) == texts(first)
+
+
+def test_heading_settings_do_not_invalidate(scan, tmp_path, fake_tesseract):
+    parse(scan, tmp_path / "ocr")
+    parse(scan, tmp_path / "ocr", MAX_HEADING_LENGTH=40, COALESCE_LINES=False)
+    assert len(fake_tesseract.calls) == 3
+
+
+@pytest.mark.parametrize("ocr_settings", [{"OCR_DPI": 200}, {"OCR_LANGUAGE": "deu"},
+                                          {"OCR_CONFIG": "--psm 6"}])
+def test_ocr_parameters_invalidate(scan, tmp_path, fake_tesseract, ocr_settings):
+    parse(scan, tmp_path / "ocr")
+    document = parse(scan, tmp_path / "ocr", **ocr_settings)
+    assert len(fake_tesseract.calls) == 6
+    assert "ocr_cache_hits" not in document.metrics.counters
+
+
+def test_key_follows_page_content_not_the_file(tmp_path, fake_tesseract):
+    parse(write_scanned_pdf(tmp_path / "a.pdf", pages=2), tmp_path / "ocr")
+    # The same two scans in another file, then the same with a third, new scan
+    same = parse(write_scanned_pdf(tmp_path / "b.pdf", pages=2), tmp_path / "ocr")
+    assert same.metrics.counters["ocr_cache_hits"] == 2
+    longer = parse(write_scanned_pdf(tmp_path / "c.pdf", pages=3), tmp_path / "ocr")
+    assert longer.metrics.counters["ocr_cache_hits"] == 2
+    assert len(fake_tesseract.calls) == 3
+
+
+def test_disabled_cache_always_recognizes(scan, fake_tesseract):
+    PDFParser(Settings()).parse(scan)
+    document = PDFParser(Settings()).parse(scan)
+    assert len(fake_tesseract.calls) == 6
+    assert "ocr_cache_hits" not in document.metrics.counters
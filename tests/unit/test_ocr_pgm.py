@@ -0,0 +1,49 @@
+import os
+from types import SimpleNamespace
+
+import fitz  # PyMuPDF
+
+from conftest import page_shade, write_scanned_pdf
+from config.settings import Settings
+from extractor.ocr import OCREngine, _pgm_file
+from extractor.pdf_parser import PDFParser
+
+
+def test_render_page_is_grayscale_without_alpha(tmp_path):
+    with fitz.open(write_scanned_pdf(tmp_path / "scan.pdf", pages=1)) as doc:
+        pix = OCREngine(Settings()).render_page(doc[0], dpi=144)
+        width = round(doc[0].rect.width * 2)
+    assert (pix.n, pix.alpha, pix.width) == (1, 0, width)
+    assert pix.stride == pix.width
+
+
+def test_pgm_file_holds_the_pixmap_samples(tmp_path):
+    with fitz.open(write_scanned_pdf(tmp_path / "scan.pdf", pages=1)) as doc:
+        pix = OCREngine(Settings()).render_page(doc[0], dpi=36)
+    with _pgm_file(pix) as path:
+        data = open(path, "rb").read()
+    assert data == f"P5\n{pix.width} {pix.height}\n255\n".encode("ascii") + pix.samples
+
+
+def test_pgm_file_drops_row_padding():
+    # Three 2-pixel rows, each padded to a stride of 4 bytes
+    pix = SimpleNamespace(width=2, height=3, stride=4,
+                          samples_mv=memoryview(b"ab..cd..ef.."))
+    with _pgm_file(pix) as path:
+        data = open(path, "rb").read()
+    assert data == b"P5\n2 3\n255\nabcdef"
+
+
+def test_pgm_file_is_removed():
+    pix = SimpleNamespace(width=1, height=1, stride=1, samples_mv=memoryview(b"x"))
+    with _pgm_file(pix) as path:
+        assert os.path.exists(path)
+    assert not os.path.exists(path)
+
+
+def test_tesseract_receives_pages_at_ocr_dpi(tmp_path, fake_tesseract):
+    path = write_scanned_pdf(tmp_path / "scan.pdf", pages=2)
+    PDFParser(Settings(OCR_DPI=144)).parse(path)
+    with fitz.open(path) as doc:
+        size = (round(doc[0].rect.width * 2), round(doc[0].rect.height * 2))
+    assert fake_tesseract.calls == [[(*size, page_shade(0))], [(*size, page_shade(1))]]
@@ -0,0 +1,45 @@
+import fitz  # PyMuPDF
+
+from conftest import FakeTesseract, page_shade, write_pdf, write_scanned_pdf
+from config.settings import Settings
+from extractor.pdf_parser import PDFParser
+
+
+def page_texts(document):
+    return [(row.page, row.text) for row in document.text_blocks]
+
+
+def expected_texts(pages, first_page=1):
+    return [(first_page + i, line) for i in range(pages)
+            for line in FakeTesseract.page_text(page_shade(i))]
+
+
+def test_inline_ocr_recognizes_every_scanned_page(tmp_path, fake_tesseract):
+    path = write_scanned_pdf(tmp_path / "scan.pdf", pages=3)
+    document = PDFParser(Settings()).parse(path)
+    assert page_texts(document) == expected_texts(3)
+    assert document.metrics.counters["ocr_pages"] == 3
+    assert len(fake_tesseract.calls) == 3
+
+
+def test_pool_keeps_page_order(tmp_path, fake_tesseract):
+    path = write_scanned_pdf(tmp_path / "scan.pdf", pages=8)
+    fake_tesseract.delay = 0.05
+    document = PDFParser(Settings(OCR_WORKERS=4)).parse(path)
+    assert page_texts(document) == expected_texts(8)
+    assert document.metrics.counters["ocr_pages"] == 8
+    assert document.metrics.stages["ocr"].calls == 8
+    assert 1 < fake_tesseract.max_active <= 4
+
+
+def test_pool_interleaves_text_and_scanned_pages(tmp_path, fake_tesseract):
+    path = write_pdf(tmp_path / "mixed.pdf", chapters=2)
+    with fitz.open(str(path)) as doc, fitz.open(write_scanned_pdf(tmp_path / "scan.pdf")) as scan:
+        doc.insert_pdf(scan, start_at=1)
+        doc.save(str(tmp_path / "merged.pdf"))
+    inline = PDFParser(Settings()).parse(tmp_path / "merged.pdf")
+    pooled = PDFParser(Settings(OCR_WORKERS=3)).parse(tmp_path / "merged.pdf")
+    assert page_texts(pooled) == page_texts(inline)
+    assert sorted({page for page, _ in page_texts(pooled)}) == [1, 2, 3, 4]
+    assert [text for page, text in page_texts(pooled) if page in (2, 3)] == [
+        text for _, text in expected_texts(2)]
@@ -0,0 +1,78 @@
+import mmap
+import random
+from pathlib import Path
+
+import fitz  # PyMuPDF
+import pytest
+
+from conftest import write_pdf
+from config.settings import Settings
+from extractor import pdf_parser
+from extractor.pdf_parser import PDFParser, open_pdf
+from extractor.utils import hash_file
+from pipeline import batch
+
+
+@pytest.fixture
+def big_pdf(tmp_path):
+    """A PDF of just over 1 MB, so that MMAP_MIN_MB=1 maps it."""
+    path = write_pdf(tmp_path / "big.pdf", chapters=2)
+    with fitz.open(str(path)) as doc:
+        # Incompressible, so the file really grows past 1 MB
+        doc.embfile_add("padding.bin", random.Random(0).randbytes(1100 * 1024))
+        doc.saveIncr()
+    assert path.stat().st_size > 1024 * 1024
+    return path
+
+
+def page_texts(source):
+    # The document is dropped on return: PyMuPDF holds on to a buffer until then, even once closed
+    with open_pdf(source) as doc:
+        return [page.get_text() for page in doc]
+
+
+def test_buffers_open_like_the_path(sample_pdf):
+    expected = page_texts(sample_pdf)
+    data = sample_pdf.read_bytes()
+    with open(sample_pdf, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for source in (sample_pdf, str(sample_pdf), data, bytearray(data), memoryview(data), mapped):
+            assert page_texts(source) == expected
+
+
+def test_buffers_are_copied_without_stream_support(sample_pdf, monkeypatch):
+    monkeypatch.setattr(pdf_parser, "buffer_streams_supported", lambda: False)
+    with open_pdf(memoryview(sample_pdf.read_bytes())) as doc:
+        assert len(doc) == 6
+
+
+def test_parse_from_memory_names_the_document(sample_pdf):
+    document = PDFParser(Settings()).parse(sample_pdf.read_bytes(), filename="upload.pdf")
+    assert (document.filename, document.filepath, document.page_count) == ("upload.pdf", "", 6)
+
+
+def run_document(pdf_path, monkeypatch, **settings):
+    """Process pdf_path as a batch worker does; returns the result and the source type parsed."""
+    batch._init_worker(Settings(**settings))
+    sources = []
+    run = batch._worker_pipeline.run
+
+    def recording_run(source, *args, **kwargs):
+        sources.append(type(source))
+        return run(source, *args, **kwargs)
+
+    monkeypatch.setattr(batch._worker_pipeline, "run", recording_run)
+    return batch._process_document(pdf_path), sources[0]
+
+
+@pytest.mark.parametrize("supported", [True, False])
+def test_large_files_are_mapped_only_where_pymupdf_reads_buffers(big_pdf, monkeypatch, supported):
+    monkeypatch.setattr(batch, "buffer_streams_supported", lambda: supported)
+    result, source_type = run_document(big_pdf, monkeypatch, MMAP_MIN_MB=1)
+    assert result.success
+    assert result.content_hash == hash_file(big_pdf)
+    assert issubclass(source_type, memoryview) == supported
+
+
+def test_small_files_are_opened_by_path(sample_pdf, monkeypatch):
+    result, source_type = run_document(sample_pdf, monkeypatch, MMAP_MIN_MB=1)
+    assert result.success and issubclass(source_type, Path)
@@ -0,0 +1,80 @@
+import fitz  # PyMuPDF
+import pytest
+
+from conftest import BODY_LINE, FakeTesseract, page_shade, write_pdf, write_scanned_pdf
+from config.settings import Settings
+from extractor import page_triage
+from extractor.pdf_parser import PDFParser
+from models.document import FontInfo, TextBlock
+from models.span_table import SpanTable
+
+
+def first_page_kind(path, **thresholds):
+    with fitz.open(path) as doc:
+        return page_triage.classify_page(doc[0], **thresholds)
+
+
+def test_text_page(sample_pdf):
+    assert first_page_kind(sample_pdf) == page_triage.TEXT
+
+
+def test_scanned_and_hybrid_pages(tmp_path):
+    assert first_page_kind(write_scanned_pdf(tmp_path / "scan.pdf")) == page_triage.SCANNED
+    hybrid = write_scanned_pdf(tmp_path / "hybrid.pdf", caption="Figure 1")
+    assert first_page_kind(hybrid) == page_triage.HYBRID
+    assert first_page_kind(hybrid, text_threshold=5) == page_triage.TEXT
+
+
+def test_small_images_do_not_make_a_scan(tmp_path):
+    path = write_scanned_pdf(tmp_path / "scan.pdf")
+    with fitz.open(path) as doc:
+        page = doc.new_page()
+        page.insert_image(fitz.Rect(0, 0, 100, 100), pixmap=doc[0].get_pixmap(dpi=10))
+        assert page_triage.classify_page(page) == page_triage.TEXT
+        assert page_triage.classify_page(doc[0], image_coverage=1.01) == page_triage.TEXT
+
+
+def test_invisible_ocr_layer_counts_as_text(tmp_path):
+    path = write_scanned_pdf(tmp_path / "scan.pdf", pages=1)
+    with fitz.open(path) as doc:
+        doc[0].insert_text((72, 72), BODY_LINE, fontname="helv", fontsize=10, render_mode=3)
+        assert page_triage.classify_page(doc[0]) == page_triage.TEXT
+
+
+@pytest.fixture
+def triage_pdf(tmp_path):
+    """A text page, a scanned page and a hybrid page with a caption."""
+    path = write_pdf(tmp_path / "triage.pdf", chapters=1, body_lines=3)
+    with fitz.open(str(path)) as doc:
+        for caption in ("", "Figure 1"):
+            name = "hybrid" if caption else "scan"
+            with fitz.open(write_scanned_pdf(tmp_path / f"{name}.pdf", pages=1,
+                                             caption=caption)) as scan:
+                doc.insert_pdf(scan)
+        doc.saveIncr()
+    return path
+
+
+def test_only_scanned_and_hybrid_pages_are_ocred(triage_pdf, fake_tesseract):
+    document = PDFParser(Settings()).parse(triage_pdf)
+    assert len(fake_tesseract.calls) == 2
+    scanned_text = FakeTesseract.page_text(page_shade(0))
+    pages = {page: [row.text for row in document.text_blocks if row.page == page]
+             for page in (1, 2, 3)}
+    assert pages[1][0] == "A Generated Test Document"
+    assert pages[2] == scanned_text
+    # A hybrid page keeps its text layer and gains the OCR lines
+    assert pages[3] == ["Figure 1"] + scanned_text
+
+
+def test_threshold_comes_from_settings(triage_pdf, fake_tesseract):
+    PDFParser(Settings(SCANNED_TEXT_THRESHOLD=5)).parse(triage_pdf)
+    assert len(fake_tesseract.calls) == 1
+
+
+def test_ocr_lines_already_in_the_text_layer_are_dropped():
+    font = FontInfo(family="Helvetica", size=10.0, flags=0, color="#000000")
+    layer = SpanTable.from_blocks([TextBlock("Figure  1", 1, 0, 0, 10, 10, font)])
+    ocr = [TextBlock(text, 1, 0, 0, 10, 12, font) for text in ("figure 1", "Caption text")]
+    merged = PDFParser(Settings())._merge_ocr_blocks(layer, ocr)
+    assert [row.text for row in merged] == ["Figure  1", "Caption text"]
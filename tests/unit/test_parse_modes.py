@@ -0,0 +1,53 @@
+import fitz  # PyMuPDF
+import pytest
+
+from conftest import write_pdf
+from config.settings import Settings
+from pipeline.worker import ExtractionPipeline
+
+MODES = {
+    "streaming": {"STREAMING": True},
+    "headings_only": {"HEADINGS_ONLY": True, "HEADINGS_ONLY_SAMPLE_PAGES": 2},
+    "page_workers": {"PAGE_WORKERS": 2, "MIN_PAGES_FOR_PAGE_WORKERS": 2, "PAGE_CHUNK_SIZE": 2},
+}
+
+
+def write_large_opening(path):
+    """
+    write_pdf's chapters behind two pages of 24pt text, which hold the average
+    font size of the pages parsed so far above the 16pt chapter headings.
+    """
+    write_pdf(path, chapters=8)
+    with fitz.open(str(path)) as doc:
+        for page_num in range(2):
+            page = doc.new_page(page_num)
+            for line in range(30):
+                page.insert_text((72, 72 + 24 * line), "Large print", fontname="helv", fontsize=24)
+        doc.saveIncr()
+    return path
+
+
+@pytest.fixture(scope="module", params=["generated", "large_opening"])
+def default_output(request, tmp_path_factory):
+    path = tmp_path_factory.mktemp("modes") / f"{request.param}.pdf"
+    if request.param == "large_opening":
+        write_large_opening(path)
+    else:
+        write_pdf(path)
+    output, _ = ExtractionPipeline(Settings()).run(path)
+    return path, output
+
+
+def test_default_mode_finds_the_chapters(default_output):
+    _, output = default_output
+    texts = [entry["text"] for entry in output["outline"]]
+    for chapter in range(1, 7):
+        assert f"{chapter}. Chapter heading {chapter}" in texts
+
+
+@pytest.mark.parametrize("mode", sorted(MODES))
+def test_parse_modes_produce_the_same_outline(default_output, mode):
+    path, expected = default_output
+    output, _ = ExtractionPipeline(Settings(**MODES[mode])).run(path)
+    assert output == expected
+
@@ -0,0 +1,32 @@
+from conftest import write_pdf
+from config.settings import Settings
+from pipeline.worker import ExtractionPipeline
+
+
+def outline(output):
+    return [(entry["level"], entry["text"], entry["page"]) for entry in output["outline"]]
+
+
+def test_preview_has_the_title_and_first_level_headings(tmp_path):
+    path = write_pdf(tmp_path / "titled.pdf", sections=True)
+    pipeline = ExtractionPipeline(Settings(PREVIEW_PAGES=3))
+    preview, metrics = pipeline.preview(path)
+    assert outline(preview) == [
+        ("H1", "A Generated Test Document", 1),
+        ("H2", "1. Chapter heading 1", 1),
+        ("H2", "2. Chapter heading 2", 2),
+        ("H2", "3. Chapter heading 3", 3),
+    ]
+    assert metrics.counters["pages"] == 3
+
+    # The full outline has the same levels, plus the sections and the later chapters
+    full, _ = pipeline.run(path)
+    assert [entry for entry in outline(full) if entry[0] != "H3" and entry[2] <= 3] == outline(preview)
+    assert ("H3", "1.1 Section of chapter 1", 1) in outline(full)
+
+
+def test_preview_uses_top_level_bookmarks(tmp_path):
+    toc = [[1, "Introduction", 1], [2, "Background", 2], [1, "Method", 3], [1, "Results", 5]]
+    path = write_pdf(tmp_path / "bookmarked.pdf", toc=toc)
+    preview, _ = ExtractionPipeline(Settings(PREVIEW_PAGES=4)).preview(path)
+    assert outline(preview) == [("H1", "Introduction", 1), ("H1", "Method", 3)]
@@ -0,0 +1,33 @@
+import importlib
+import json
+
+import pytest
+
+from conftest import write_pdf
+from config.settings import Settings
+
+
+@pytest.fixture
+def process_pdfs(tmp_path, monkeypatch):
+    # main sets up logging to logs/extractor.log in the working directory on import
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module("main").process_pdfs
+
+
+@pytest.mark.parametrize("sink", ["json", "jsonl", "sqlite"])
+def test_sink_time_is_part_of_the_document_metrics(tmp_path, process_pdfs, sink):
+    input_dir, output_dir = tmp_path / "input", tmp_path / "output"
+    input_dir.mkdir()
+    output_dir.mkdir()
+    for i in range(3):
+        write_pdf(input_dir / f"doc{i}.pdf", chapters=2)
+
+    settings = Settings(OUTPUT_SINK=sink, SINK_BATCH_SIZE=2, WRITE_METRICS=True)
+    process_pdfs(input_dir, output_dir, settings)
+
+    records = [json.loads(line) for line in (output_dir / "metrics.jsonl").read_text().splitlines()]
+    assert sorted(r["file"] for r in records) == ["doc0.pdf", "doc1.pdf", "doc2.pdf"]
+    # The write, and the document's share of its batch's flush
+    assert all(r["stages"]["sink"]["calls"] == 2 for r in records)
+    summary = json.loads((output_dir / "run_summary.json").read_text())
+    assert summary["stages"]["sink"]["calls"] == 6
@@ -0,0 +1,88 @@
+import fitz  # PyMuPDF
+import pytest
+
+from conftest import write_pdf
+from config.settings import Settings
+from pipeline import cache as cache_module
+from pipeline.worker import ExtractionPipeline
+
+
+@pytest.fixture
+def cache_settings(tmp_path):
+    return {"RESULT_CACHE_DIR": str(tmp_path / "cache")}
+
+
+def run(path, **settings):
+    return ExtractionPipeline(Settings(**settings)).run(path)
+
+
+def entries(cache_dir):
+    return [p for p in cache_dir.rglob("*") if p.is_file()]
+
+
+def test_unchanged_document_is_served_from_the_cache(sample_pdf, cache_settings):
+    first, metrics = run(sample_pdf, **cache_settings)
+    assert "cache_hits" not in metrics.counters
+    second, metrics = run(sample_pdf, **cache_settings)
+    assert metrics.counters["cache_hits"] == 1
+    assert "parse" not in metrics.stages
+    assert second == first
+
+
+def test_cached_record_takes_the_new_file_name(sample_pdf, cache_settings, tmp_path):
+    run(sample_pdf, **cache_settings)
+    copy = tmp_path / "renamed.pdf"
+    copy.write_bytes(sample_pdf.read_bytes())
+    output, metrics = run(copy, **cache_settings)
+    assert metrics.counters["cache_hits"] == 1
+    assert output["title"] == "renamed.pdf"
+
+
+def test_changed_content_misses(sample_pdf, cache_settings):
+    run(sample_pdf, **cache_settings)
+    write_pdf(sample_pdf, chapters=3)
+    output, metrics = run(sample_pdf, **cache_settings)
+    assert "cache_hits" not in metrics.counters
+    assert "4. Chapter heading 4" not in [entry["text"] for entry in output["outline"]]
+
+
+def test_extraction_settings_invalidate_and_runtime_settings_do_not(sample_pdf, cache_settings):
+    run(sample_pdf, **cache_settings)
+    _, metrics = run(sample_pdf, WORKERS=4, SINK_BATCH_SIZE=7, **cache_settings)
+    assert metrics.counters["cache_hits"] == 1
+    _, metrics = run(sample_pdf, MAX_HEADING_LENGTH=80, **cache_settings)
+    assert "cache_hits" not in metrics.counters
+
+
+def test_extractor_version_invalidates(sample_pdf, cache_settings, monkeypatch):
+    run(sample_pdf, **cache_settings)
+    monkeypatch.setattr(cache_module, "EXTRACTOR_VERSION", "0.0.0")
+    _, metrics = run(sample_pdf, **cache_settings)
+    assert "cache_hits" not in metrics.counters
+
+
+def test_partial_results_are_not_cached(sample_pdf, cache_settings, tmp_path):
+    output, _ = run(sample_pdf, DOCUMENT_TIME_BUDGET=1e-9, **cache_settings)
+    assert output["partial"]
+    assert entries(tmp_path / "cache") == []
+    _, metrics = run(sample_pdf, **cache_settings)
+    assert "cache_hits" not in metrics.counters
+
+
+def test_corrupt_entry_is_ignored(sample_pdf, cache_settings, tmp_path):
+    expected, _ = run(sample_pdf, **cache_settings)
+    [entry] = entries(tmp_path / "cache")
+    entry.write_bytes(b"{not json")
+    output, metrics = run(sample_pdf, **cache_settings)
+    assert "cache_hits" not in metrics.counters
+    assert output == expected
+
+
+def test_key_for_bytes_matches_key_for_path(sample_pdf, cache_settings):
+    result_cache = cache_module.ResultCache(Settings(**cache_settings))
+    data = sample_pdf.read_bytes()
+    assert result_cache.key_for(sample_pdf) == result_cache.key_for(data)
+    assert result_cache.key_for(sample_pdf) == result_cache.key_for(memoryview(data))
+    with fitz.open() as other:
+        other.new_page()
+        assert result_cache.key_for(other.tobytes()) != result_cache.key_for(data)
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import pytest
+
+from conftest import write_pdf, write_scanned_pdf
+from config.settings import Settings
+from pipeline import batch
+from pipeline.scheduler import estimate_document_cost, order_by_cost
+
+
+def test_cost_grows_with_pages(tmp_path):
+    short = estimate_document_cost(write_pdf(tmp_path / "short.pdf", chapters=2))
+    long = estimate_document_cost(write_pdf(tmp_path / "long.pdf", chapters=8))
+    assert 0 < short < long
+
+
+def test_scanned_pages_cost_more_than_text(tmp_path):
+    text = estimate_document_cost(write_pdf(tmp_path / "text.pdf", chapters=2))
+    scanned = estimate_document_cost(write_scanned_pdf(tmp_path / "scanned.pdf", pages=2))
+    hybrid = estimate_document_cost(write_scanned_pdf(tmp_path / "hybrid.pdf", pages=2,
+                                                      caption="Figure 1"))
+    assert scanned > text
+    # Hybrid pages need OCR too; only the file sizes differ
+    assert hybrid == pytest.approx(scanned, rel=1e-3)
+
+
+def test_unreadable_files_cost_nothing(tmp_path):
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    assert estimate_document_cost(broken) == 0.0
+    assert estimate_document_cost(tmp_path / "missing.pdf") == 0.0
+
+
+def test_order_by_cost_is_descending_and_stable():
+    files = [Path(name) for name in ("a.pdf", "b.pdf", "c.pdf", "d.pdf")]
+    assert order_by_cost(files, [1.0, 5.0, 1.0, 3.0]) == [Path("b.pdf"), Path("d.pdf"),
+                                                         Path("a.pdf"), Path("c.pdf")]
+    assert order_by_cost([], []) == []
+
+
+def test_pool_starts_the_most_expensive_files_first(tmp_path):
+    files = [write_pdf(tmp_path / f"small{i}.pdf", chapters=1) for i in range(2)]
+    files += [write_pdf(tmp_path / f"large{i}.pdf", chapters=12) for i in range(2)]
+    results = list(batch.run_batch(files, Settings(SCHEDULE_BY_COST=True), workers=2))
+    by_start = sorted(results, key=lambda r: r.started_at)
+    assert {r.pdf_path.name for r in by_start[:2]} == {"large0.pdf", "large1.pdf"}
@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from conftest import write_pdf
+from config.settings import Settings
+from pipeline import server
+from pipeline.worker import ExtractionPipeline
+
+_process_bytes = server._process_bytes
+
+
+def _crash_on_crash_pdf(data, filename, preview=False):
+    """Stand-in for batch._process_bytes whose worker dies on crash.pdf."""
+    if filename == "crash.pdf":
+        os._exit(1)
+    return _process_bytes(data, filename, preview)
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    service = server.ExtractionService(Settings(PREVIEW_PAGES=2), workers=1)
+    handler = type("TestHandler", (server.ExtractionRequestHandler,), {"service": service})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+    service.close()
+
+
+@pytest.fixture(scope="module")
+def pdf_path(tmp_path_factory):
+    return write_pdf(tmp_path_factory.mktemp("server") / "served.pdf", chapters=4)
+
+
+def request(url, body=None, content_type="application/pdf"):
+    """Return (status, JSON payload) of a GET, or of a POST if body is given."""
+    req = urllib.request.Request(url, data=body)
+    if body is not None:
+        req.add_header("Content-Type", content_type)
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_health(base_url):
+    assert request(f"{base_url}/health") == (200, {"status": "ok", "workers": 1})
+
+
+def test_extract_bytes_and_path_match_the_pipeline(base_url, pdf_path):
+    expected, _ = ExtractionPipeline(Settings()).run(pdf_path)
+    status, output = request(f"{base_url}/extract?filename=served.pdf", pdf_path.read_bytes())
+    assert (status, output) == (200, expected)
+    body = json.dumps({"path": str(pdf_path)}).encode('utf-8')
+    assert request(f"{base_url}/extract", body, "application/json") == (200, expected)
+
+
+def test_bytes_without_a_filename_get_a_default_title(base_url, pdf_path):
+    status, output = request(f"{base_url}/extract", pdf_path.read_bytes())
+    assert status == 200
+    assert output["title"] == "document.pdf"
+
+
+def test_preview_stops_at_preview_pages(base_url, pdf_path):
+    status, output = request(f"{base_url}/preview?filename=served.pdf", pdf_path.read_bytes())
+    assert status == 200
+    assert {entry["page"] for entry in output["outline"]} == {1, 2}
+
+
+@pytest.mark.parametrize("path, body, content_type, status", [
+    ("/missing", b"x", "application/pdf", 404),
+    ("/extract", b"", "application/pdf", 400),
+    ("/extract", b"[]", "application/json", 400),
+    ("/extract", b'{"path": "/no/such/file.pdf"}', "application/json", 404),
+    ("/extract", b"not a pdf", "application/pdf", 422),
+])
+def test_bad_requests(base_url, path, body, content_type, status):
+    code, payload = request(f"{base_url}{path}", body, content_type)
+    assert code == status
+    assert payload["error"]
+
+
+def test_dead_worker_is_a_500_and_the_pool_recovers(base_url, pdf_path, monkeypatch):
+    monkeypatch.setattr(server, "_process_bytes", _crash_on_crash_pdf)
+    status, payload = request(f"{base_url}/extract?filename=crash.pdf", pdf_path.read_bytes())
+    assert status == 500
+    assert "died" in payload["error"]
+    status, output = request(f"{base_url}/extract?filename=served.pdf", pdf_path.read_bytes())
+    assert status == 200
+    assert output["outline"]
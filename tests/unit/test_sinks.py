@@ -0,0 +1,90 @@
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from pipeline.sinks import JsonFileSink, JsonLinesSink, SqliteSink, create_sink
+
+RECORD = {"title": "Doc", "outline": [{"level": "H1", "text": "Intro", "page": 1},
+                                      {"level": "H2", "text": "Scope", "page": 2}]}
+
+
+def read_jsonl(path):
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+
+def test_create_sink(tmp_path):
+    assert isinstance(create_sink("json", tmp_path), JsonFileSink)
+    with create_sink("jsonl", tmp_path, resume_window=5) as sink:
+        assert isinstance(sink, JsonLinesSink)
+    with create_sink("sqlite", tmp_path) as sink:
+        assert isinstance(sink, SqliteSink)
+    with pytest.raises(ValueError):
+        create_sink("csv", tmp_path)
+
+
+def test_json_file_sink(tmp_path):
+    with create_sink("json", tmp_path) as sink:
+        sink.write(Path("in/report.pdf"), RECORD)
+    assert json.loads((tmp_path / "report_outline.json").read_text(encoding='utf-8')) == RECORD
+
+
+def test_jsonl_records_are_written_on_flush(tmp_path):
+    sink = create_sink("jsonl", tmp_path)
+    sink.write(Path("a.pdf"), RECORD)
+    assert (tmp_path / JsonLinesSink.FILENAME).read_text() == ""
+    sink.close()
+    assert read_jsonl(tmp_path / JsonLinesSink.FILENAME) == [{"file": "a.pdf", **RECORD}]
+
+
+def test_jsonl_resume_skips_identical_records(tmp_path):
+    with create_sink("jsonl", tmp_path) as sink:
+        sink.write(Path("a.pdf"), RECORD)
+        sink.write(Path("b.pdf"), RECORD)
+    changed = {**RECORD, "title": "Changed"}
+    with create_sink("jsonl", tmp_path) as sink:
+        sink.write(Path("a.pdf"), RECORD)
+        sink.write(Path("b.pdf"), changed)
+        sink.write(Path("c.pdf"), RECORD)
+    records = read_jsonl(tmp_path / JsonLinesSink.FILENAME)
+    assert [(r["file"], r["title"]) for r in records] == [
+        ("a.pdf", "Doc"), ("b.pdf", "Doc"), ("b.pdf", "Changed"), ("c.pdf", "Doc")]
+
+
+def test_jsonl_resume_window_limits_deduplication(tmp_path):
+    with create_sink("jsonl", tmp_path) as sink:
+        for name in ("a.pdf", "b.pdf", "c.pdf"):
+            sink.write(Path(name), RECORD)
+    with create_sink("jsonl", tmp_path, resume_window=2) as sink:
+        sink.write(Path("a.pdf"), RECORD)
+        sink.write(Path("c.pdf"), RECORD)
+    assert [r["file"] for r in read_jsonl(tmp_path / JsonLinesSink.FILENAME)] == [
+        "a.pdf", "b.pdf", "c.pdf", "a.pdf"]
+
+
+def test_jsonl_torn_record_is_terminated(tmp_path):
+    path = tmp_path / JsonLinesSink.FILENAME
+    path.write_text(json.dumps({"file": "a.pdf", **RECORD}) + "\n" + '{"file": "b.p', encoding='utf-8')
+    with create_sink("jsonl", tmp_path) as sink:
+        sink.write(Path("b.pdf"), RECORD)
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 3
+    assert json.loads(lines[2]) == {"file": "b.pdf", **RECORD}
+
+
+def test_sqlite_reprocessed_documents_replace_their_rows(tmp_path):
+    with create_sink("sqlite", tmp_path) as sink:
+        sink.write(Path("a.pdf"), RECORD)
+        sink.write(Path("b.pdf"), RECORD)
+    with create_sink("sqlite", tmp_path) as sink:
+        sink.write(Path("a.pdf"), {"title": "New", "outline": [{"level": "H1", "text": "Only", "page": 3}]})
+    conn = sqlite3.connect(str(tmp_path / SqliteSink.FILENAME))
+    documents = conn.execute("SELECT file, title, heading_count FROM documents ORDER BY file").fetchall()
+    headings = conn.execute(
+        "SELECT d.file, h.position, h.level, h.text, h.page FROM headings h "
+        "JOIN documents d ON d.id = h.document_id ORDER BY d.file, h.position").fetchall()
+    conn.close()
+    assert documents == [("a.pdf", "New", 1), ("b.pdf", "Doc", 2)]
+    assert headings == [("a.pdf", 0, "H1", "Only", 3), ("b.pdf", 0, "H1", "Intro", 1),
+                        ("b.pdf", 1, "H2", "Scope", 2)]
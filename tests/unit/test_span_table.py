@@ -0,0 +1,104 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from models.document import FontInfo, TextBlock
+from models.font_registry import FontRegistry
+from models.span_table import SpanTable, SpanTableBuilder
+
+
+def build(spans, fonts=None):
+    builder = SpanTableBuilder(fonts)
+    for text, page, size in spans:
+        builder.add(text, page, 10.0, 20.0, 30.0, size, family="Helvetica", size=size, flags=0, color=0x102030)
+    return builder.build()
+
+
+def test_builder_columns_and_rows():
+    table = build([("Hello", 1, 12.0), ("World", 2, 10.0)])
+    assert len(table) == 2
+    assert table.text_buffer == "HelloWorld"
+    assert table.text_offsets.tolist() == [0, 5, 10]
+    row = table[1]
+    assert (row.text, row.page, row.x, row.height) == ("World", 2, 10.0, 10.0)
+    assert row.font_info == FontInfo(family="Helvetica", size=10.0, flags=0, color="#102030")
+    assert table[-1].text == "World"
+    with pytest.raises(IndexError):
+        table[2]
+
+
+def test_fonts_are_interned():
+    table = build([("a", 1, 12.0), ("b", 1, 12.0), ("c", 1, 10.0)])
+    assert len(table.fonts) == 2
+    assert table[0].font_info is table[1].font_info
+
+
+def test_slices_return_rows():
+    table = build([(str(i), 1, 10.0) for i in range(5)])
+    assert [row.text for row in table[1:3]] == ["1", "2"]
+    assert [row.text for row in table[::-2]] == ["4", "2", "0"]
+    assert table[10:] == []
+
+
+def test_concat_shared_registry():
+    fonts = FontRegistry()
+    a = build([("one", 1, 12.0)], fonts)
+    b = build([("two", 2, 12.0), ("three", 2, 10.0)], fonts)
+    table = SpanTable.concat([a, SpanTable.empty(), b])
+    assert [row.text for row in table] == ["one", "two", "three"]
+    assert table.fonts is fonts
+
+
+def test_concat_remaps_fonts():
+    a = build([("one", 1, 10.0)])
+    b = build([("two", 2, 14.0), ("three", 2, 10.0)])
+    table = SpanTable.concat([a, b])
+    assert [row.text for row in table] == ["one", "two", "three"]
+    assert [row.font_info.size for row in table] == [10.0, 14.0, 10.0]
+    # First-appearance order is kept, and equal fonts from both tables share an id
+    assert [font.size for font in table.fonts] == [10.0, 14.0]
+    assert table.font_id.tolist() == [0, 1, 0]
+
+
+def test_concat_of_nothing_is_empty():
+    assert len(SpanTable.concat([])) == 0
+
+
+def test_select_copies_the_selected_spans():
+    table = build([("keep", 1, 14.0), ("drop", 1, 10.0), ("also", 2, 14.0)])
+    selected = table.select(table.size >= 12.0)
+    assert [row.text for row in selected] == ["keep", "also"]
+    assert selected.text_buffer == "keepalso"
+    assert selected.page.tolist() == [1, 2]
+    assert selected.fonts is table.fonts
+    assert selected is not table.select(np.ones(len(table), dtype=bool))
+    assert len(table.select(np.zeros(len(table), dtype=bool))) == 0
+
+
+def test_from_blocks_round_trip():
+    font = FontInfo(family="Times-Bold", size=16.0, flags=16, color="#000000")
+    blocks = [TextBlock(text="Heading", page=3, x=1.0, y=2.0, width=3.0, height=4.0, font_info=font)]
+    row = SpanTable.from_blocks(blocks)[0]
+    assert row.to_text_block() == blocks[0]
+
+
+def test_list_caches_are_released_and_not_pickled():
+    table = build([("a", 1, 10.0), ("b", 1, 12.0)])
+    assert table[1].text == "b"
+    assert table._lists
+    assert pickle.loads(pickle.dumps(table))._lists == {}
+    table.release_lists()
+    assert table._lists == {}
+    assert table[0].text == "a"
+
+
+def test_whitespace_columns_follow_their_spans():
+    builder = SpanTableBuilder()
+    builder.add("1.", 1, 0.0, 0.0, 10.0, 10.0, family="Helvetica", size=10.0, flags=0, color=0, space_after=True)
+    builder.add("Intro", 1, 10.0, 0.0, 30.0, 10.0, family="Helvetica", size=10.0, flags=0, color=0)
+    table = builder.build()
+    both = SpanTable.concat([table, build([("x", 2, 10.0)])])
+    assert both.space_after.tolist() == [True, False, False]
+    assert both.select(np.array([True, False, True])).space_after.tolist() == [True, False]
+    assert not both.space_before.any()
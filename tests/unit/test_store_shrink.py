@@ -0,0 +1,66 @@
+import fitz  # PyMuPDF
+import pytest
+
+from conftest import write_pdf
+from config.settings import Settings
+from extractor.pdf_parser import PDFParser
+from pipeline.worker import ExtractionPipeline
+
+
+@pytest.fixture
+def shrinks(monkeypatch):
+    """Record the percentages MuPDF's store is shrunk by."""
+    calls = []
+    shrink = fitz.TOOLS.store_shrink
+
+    def recording_shrink(percent):
+        calls.append(percent)
+        return shrink(percent)
+
+    monkeypatch.setattr(fitz.TOOLS, "store_shrink", recording_shrink)
+    return calls
+
+
+def test_store_is_not_trimmed_by_default(sample_pdf, shrinks):
+    document = PDFParser(Settings()).parse(sample_pdf)
+    assert shrinks == []
+    assert "store_shrinks" not in document.metrics.counters
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_store_is_trimmed_every_interval_and_after_the_document(sample_pdf, shrinks, streaming):
+    settings = Settings(STREAMING=streaming, STORE_SHRINK_INTERVAL=2, STORE_SHRINK_PERCENT=50)
+    output, metrics = ExtractionPipeline(settings).run(sample_pdf)
+    # Six pages: after pages 2, 4 and 6, and once more when the document is done
+    assert shrinks == [50] * 4
+    assert metrics.counters["store_shrinks"] == 4
+    expected, _ = ExtractionPipeline(Settings(STREAMING=streaming)).run(sample_pdf)
+    assert output == expected
+
+
+def test_peak_memory_is_reported(sample_pdf):
+    document = PDFParser(Settings()).parse(sample_pdf)
+    assert document.metrics.peaks["max_rss_kb"] > 0
+    assert document.metrics.to_dict()["peaks"]["max_rss_kb"] > 0
+
+
+def test_page_workers_report_their_trims_and_peaks(tmp_path):
+    path = write_pdf(tmp_path / "long.pdf", chapters=6)
+    settings = Settings(PAGE_WORKERS=2, MIN_PAGES_FOR_PAGE_WORKERS=2, PAGE_CHUNK_SIZE=3,
+                        STORE_SHRINK_INTERVAL=3)
+    document = PDFParser(settings).parse(path)
+    # Each chunk trims after its third page and when it is done, then the parent once
+    assert document.metrics.counters["store_shrinks"] == 2 * 2 + 1
+    assert document.metrics.peaks["max_rss_kb"] > 0
+    assert document.metrics.stages["page_worker"].calls == 2
+
+
+def test_page_dimensions_cover_every_parsed_page(tmp_path):
+    path = write_pdf(tmp_path / "sized.pdf", chapters=3)
+    with fitz.open(str(path)) as doc:
+        doc[1].set_mediabox(fitz.Rect(0, 0, 300, 400))
+        doc.saveIncr()
+    document = PDFParser(Settings()).parse(path, pages=range(1, 3))
+    assert document.page_dimensions[0] == (0.0, 0.0)
+    assert document.page_dimensions[1] == (300.0, 400.0)
+    assert document.page_dimensions[2] != (0.0, 0.0)